@@ -7,25 +7,56 @@ Full Tier: Full property details + comprehensive image gallery (all images)
 import os
 import re
 import json
-from typing import Dict, List, Any, Optional
-from urllib.parse import urljoin, urlparse
+import asyncio
+import inspect
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Any, Awaitable, Callable, Iterable, Iterator, Optional
+from urllib.parse import urljoin
 
 from firecrawl import Firecrawl
 
+try:
+    from firecrawl import AsyncFirecrawl
+except ImportError:  # older SDKs: the sync client is run in worker threads
+    AsyncFirecrawl = None
+
+try:
+    from firecrawl.v2.types import JsonFormat
+except ImportError:
+    JsonFormat = None
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
 
-IMAGE_EXTENSIONS = re.compile(
-    r"(\.jpg|\.jpeg|\.png|\.webp|\.avif|\.heic|\.gif)(\?|$)", 
-    re.IGNORECASE
-)
+@functools.lru_cache(maxsize=4)
+def _get_fc(api_key: str) -> Firecrawl:
+    """Return a shared Firecrawl client per API key so HTTP connections are reused."""
+    return Firecrawl(api_key=str(api_key))
+
 
+@functools.lru_cache(maxsize=8)
+def _json_formats(prompt: str) -> List[Any]:
+    """``formats=`` list for a JSON extraction, built once per prompt and reused by every scrape."""
+    return [JsonFormat(type="json", prompt=prompt)]
 
+
+@functools.lru_cache(maxsize=1024)
 def detect_site(url: str) -> str:
     """Detect site type from URL."""
-    host = urlparse(url).netloc.lower()
+    # Host is the slice between "://" and the next "/"; no full urlparse needed
+    start = url.find("://")
+    start = start + 3 if start != -1 else 0
+    end = url.find("/", start)
+    host = (url[start:] if end == -1 else url[start:end]).lower()
     if "zillow" in host:
         return "zillow"
     if "redfin" in host:
@@ -35,32 +66,29 @@ def detect_site(url: str) -> str:
     return "unknown"
 
 
+# One combined pattern per site, with the same semantics as the old chain of
+# checks: URL starts with "http" (case-sensitive), CDN name anywhere in it (or an
+# image extension for unknown sites), and no logo/icon in any case.
+_NOT_LOGO = r"^(?!.*(?i:logo|icon))http.*"
+SITE_FILTERS = {
+    "zillow": re.compile(_NOT_LOGO + r"photos\.zillowstatic\.com", re.DOTALL),
+    "redfin": re.compile(_NOT_LOGO + r"ssl\.cdn-redfin\.com", re.DOTALL),
+    "compass": re.compile(_NOT_LOGO + r"compass\.com", re.DOTALL),
+    "unknown": re.compile(
+        _NOT_LOGO + r"(?i:\.jpg|\.jpeg|\.png|\.webp|\.avif|\.heic|\.gif)(?:\?|$)",
+        re.DOTALL,
+    ),
+}
+
+
 def is_likely_listing_image(url: str, site_type: str) -> bool:
     """Check if URL is likely a listing image."""
     if not url or not isinstance(url, str):
         return False
-    if not url.startswith("http"):
-        return False
+    return SITE_FILTERS.get(site_type, SITE_FILTERS["unknown"]).match(url) is not None
 
-    # Site-specific domain checks
-    if site_type == "zillow":
-        if "photos.zillowstatic.com" not in url:
-            return False
-    elif site_type == "redfin":
-        if "ssl.cdn-redfin.com" not in url:
-            return False
-    elif site_type == "compass":
-        if "compass.com" not in url:
-            return False
-    else:
-        if not IMAGE_EXTENSIONS.search(url):
-            return False
 
-    # Filter out logos and icons
-    low = url.lower()
-    if "logo" in low or "icon" in low:
-        return False
-    return True
+_ZILLOW_CC_FT_RE = re.compile(r"-cc_ft_\d+")
 
 
 def upgrade_zillow_image_url(url: str) -> str:
@@ -70,31 +98,48 @@ def upgrade_zillow_image_url(url: str) -> str:
 
     # Upgrade low-res cc_ft URLs to high-res uncropped_scaled versions
     if any(size in url for size in ["cc_ft_576", "cc_ft_960", "cc_ft_768", "cc_ft_384"]):
-        return re.sub(r"-cc_ft_\d+", "-uncropped_scaled_within_1536_1152", url)
+        return _ZILLOW_CC_FT_RE.sub("-uncropped_scaled_within_1536_1152", url)
 
     return url
 
 
+_DIM_RE = re.compile(r"([0-9]+)x([0-9]+)")
+_COMPASS_THUMB_RE = re.compile(r"/[0-9]+x[0-9]+\.webp$")
+_COMPASS_ID_RE = re.compile(r"([a-f0-9]{32,})_img_(\d+)_[a-f0-9]+")
+_UUID_RE = re.compile(r"([a-f0-9-]{30,})")
+_PATH_RE = re.compile(r"/([^/]+)\.(?:jpg|jpeg|png|webp)", re.IGNORECASE)
+# <img ... src> and data-src (lazy-load attribute, also inside <img>) are separate
+# patterns: a single alternation lets the greedy <img[^>]+ swallow a data-src.
+_IMG_VALUE_RES = (
+    re.compile(r'<img[^>]+src=["\']([^"\']+)["\']', re.IGNORECASE),
+    re.compile(r'data-src=["\']([^"\']+)["\']', re.IGNORECASE),
+)
+
+
+# Size markers checked in priority order; the first hit sets the base score.
+_QUALITY_TAGS = (
+    ("origin.webp", 10),
+    ("1500x1000", 8),
+    ("_xl", 5), ("large", 5), ("_lg", 5),
+    ("_l", 4), ("medium", 4), ("_md", 4),
+    ("_m", 3), ("_med", 3),
+    ("_s", 2), ("small", 2),
+)
+
+
+@functools.lru_cache(maxsize=8192)
 def _quality_score_for_url(src: str) -> int:
     """Calculate quality score for image URL."""
-    quality = 0
-    if "origin.webp" in src:
-        quality = 10
-    elif "1500x1000" in src:
-        quality = 8
-    elif any(k in src for k in ["_xl", "large", "_lg"]):
-        quality = 5
-    elif any(k in src for k in ["_l", "medium", "_md"]):
-        quality = 4
-    elif any(k in src for k in ["_m", "_med"]):
-        quality = 3
-    elif any(k in src for k in ["_s", "small"]):
-        quality = 2
-    else:
-        quality = 1
-
-    # Adjust based on pixel dimensions
-    m = re.search(r"([0-9]+)x([0-9]+)", src)
+    quality = 1
+    for tag, score in _QUALITY_TAGS:
+        if tag in src:
+            quality = score
+            break
+
+    # Adjust based on pixel dimensions (skip the regex when no "WxH" is possible)
+    if "x" not in src:
+        return quality
+    m = _DIM_RE.search(src)
     if m:
         w = int(m.group(1))
         h = int(m.group(2))
@@ -108,86 +153,174 @@ def _quality_score_for_url(src: str) -> int:
     return quality
 
 
+# Optional JIT path for batch scoring. numba is not a hard dependency; without
+# it the pure-Python scorer above is used unchanged.
+try:
+    import numba
+except ImportError:
+    numba = None
+
+if numba is not None:
+    _QUALITY_TAG_BYTES = tuple(tag.encode("ascii") for tag, _ in _QUALITY_TAGS)
+    _QUALITY_TAG_SCORES = tuple(score for _, score in _QUALITY_TAGS)
+
+    @numba.njit(cache=True)
+    def _contains(buf, pat):
+        n, m = len(buf), len(pat)
+        for i in range(n - m + 1):
+            j = 0
+            while j < m and buf[i + j] == pat[j]:
+                j += 1
+            if j == m:
+                return True
+        return False
+
+    @numba.njit(cache=True)
+    def _quality_score_kernel(buf, tags, scores):
+        quality = 1
+        for k in range(len(tags)):
+            if _contains(buf, tags[k]):
+                quality = scores[k]
+                break
+
+        # First "<digits>x<digits>" run, as _DIM_RE.search finds it. Values are
+        # clamped so the product cannot overflow; thresholds are far below.
+        n = len(buf)
+        i = 0
+        while i < n:
+            if buf[i] < 48 or buf[i] > 57:
+                i += 1
+                continue
+            j, w = i, 0
+            while j < n and 48 <= buf[j] <= 57:
+                if w < 100_000_000:
+                    w = w * 10 + (buf[j] - 48)
+                j += 1
+            if j + 1 < n and buf[j] == 120 and 48 <= buf[j + 1] <= 57:
+                k, h = j + 1, 0
+                while k < n and 48 <= buf[k] <= 57:
+                    if h < 100_000_000:
+                        h = h * 10 + (buf[k] - 48)
+                    k += 1
+                pixels = w * h
+                if pixels > 1_000_000:
+                    quality += 2
+                elif pixels > 500_000:
+                    quality += 1
+                elif pixels < 50_000:
+                    quality = max(1, quality - 2)
+                return quality
+            i = j
+        return quality
+
+    @functools.lru_cache(maxsize=8192)
+    def _quality_score_jit(src: str) -> int:
+        """Same result as ``_quality_score_for_url``, computed by the numba kernel."""
+        return _quality_score_kernel(src.encode("ascii", "replace"), _QUALITY_TAG_BYTES, _QUALITY_TAG_SCORES)
+else:
+    _quality_score_jit = _quality_score_for_url
+
+
+@functools.lru_cache(maxsize=16384)
+def _compass_base_id(src: str) -> str:
+    """Identity of a Compass image across its size/quality variants."""
+    m_compass = _COMPASS_ID_RE.search(src)
+    if m_compass:
+        return f"{m_compass.group(1)}_img_{m_compass.group(2)}"
+    m_uuid = _UUID_RE.search(src)
+    if m_uuid:
+        return m_uuid.group(1)
+    m_path = _PATH_RE.search(src)
+    if m_path:
+        return m_path.group(1)
+    return src
+
+
 def deduplicate_compass_images(urls: List[str]) -> List[str]:
     """Deduplicate Compass images, keeping highest quality versions."""
-    images_by_quality: Dict[str, tuple[str, int]] = {}
-    enhanced_urls: List[str] = []
-    
-    # First, enhance small thumbnails to origin.webp
+    best_q: Dict[str, int] = {}
+    best_url: Dict[str, str] = {}
+
     for src in urls:
-        if "165x165.webp" in src or ("x" in src and src.endswith(".webp") and re.search(r"/[0-9]+x[0-9]+\.webp$", src)):
-            base = re.sub(r"/[0-9]+x[0-9]+\.webp$", "", src)
-            enhanced_urls.append(base + "/origin.webp")
-        else:
-            enhanced_urls.append(src)
-
-    # Deduplicate by base ID, keeping highest quality
-    for src in enhanced_urls:
-        base_id = src
-        m_compass = re.search(r"([a-f0-9]{32,})_img_(\d+)_[a-f0-9]+", src)
-        if m_compass:
-            base_id = f"{m_compass.group(1)}_img_{m_compass.group(2)}"
-        else:
-            m_uuid = re.search(r"([a-f0-9-]{30,})", src)
-            if m_uuid:
-                base_id = m_uuid.group(1)
-            else:
-                m_path = re.search(r"/([^/]+)\.(jpg|jpeg|png|webp)", src, re.IGNORECASE)
-                if m_path:
-                    base_id = m_path.group(1)
-
-        q = _quality_score_for_url(src)
-        if base_id not in images_by_quality or images_by_quality[base_id][1] < q:
-            images_by_quality[base_id] = (src, q)
-
-    return [u for (u, _q) in images_by_quality.values()]
+        # Enhance small thumbnails to origin.webp
+        if _COMPASS_THUMB_RE.search(src):
+            src = _COMPASS_THUMB_RE.sub("/origin.webp", src)
+
+        # Deduplicate by base ID, keeping highest quality
+        base_id = _compass_base_id(src)
+        q = _quality_score_jit(src)
+        if q > best_q.get(base_id, -1):
+            best_q[base_id] = q
+            best_url[base_id] = src
+
+    return list(best_url.values())
 
 
 # ============================================================================
 # IMAGE EXTRACTION
 # ============================================================================
 
-def extract_images_from_property_data(property_data: Dict[str, Any], site_type: str) -> List[str]:
-    """Walk nested JSON to collect likely image URLs."""
+def _dedup_capped(it: Iterable[str], cap: Optional[int] = None) -> List[str]:
+    """Order-preserving dedup that stops once ``cap`` unique items are collected."""
+    seen: set = set()
+    out: List[str] = []
+    add, app = seen.add, out.append
+    for u in it:
+        if u not in seen:
+            add(u)
+            app(u)
+            if cap and len(out) >= cap:
+                break
+    return out
+
+
+def extract_images_from_property_data(
+    property_data: Dict[str, Any], site_type: str, cap: Optional[int] = None
+) -> List[str]:
+    """Walk nested JSON to collect likely image URLs (at most ``cap`` when given)."""
+    # Compass needs every candidate to pick the best quality per image
+    if site_type == "compass":
+        cap = None
     urls: List[str] = []
-
-    def walk(val: Any):
-        if not val:
-            return
-        if isinstance(val, str):
-            s = val.strip()
-            if is_likely_listing_image(s, site_type):
+    seen: set = set()
+    is_img = SITE_FILTERS.get(site_type, SITE_FILTERS["unknown"]).match
+
+    # Iterative DFS; children are pushed reversed so URLs keep document order.
+    stack: List[Any] = [property_data]
+    stack_extend = stack.extend
+    while stack:
+        v = stack.pop()
+        t = type(v)
+        if t is dict:
+            stack_extend(reversed(v.values()))
+        elif t is list:
+            stack_extend(reversed(v))
+        elif t is str:
+            s = v.strip()
+            if s not in seen and is_img(s):
+                seen.add(s)
                 urls.append(s)
-            return
-        if isinstance(val, list):
-            for x in val:
-                walk(x)
-            return
-        if isinstance(val, dict):
-            for v in val.values():
-                walk(v)
-
-    walk(property_data)
-    unique = list(dict.fromkeys(urls))
+                if cap and len(urls) >= cap:
+                    break
 
     # Upgrade Zillow URLs to higher resolution
     if site_type == "zillow":
-        unique = [upgrade_zillow_image_url(u) for u in unique]
+        urls = [upgrade_zillow_image_url(u) for u in urls]
 
     if site_type == "compass":
-        return deduplicate_compass_images(unique)
+        return deduplicate_compass_images(urls)
     
-    return unique
+    return urls
 
 
-def extract_images_from_html(page_url: str, site_type: str) -> List[str]:
+def extract_images_from_html(page_url: str, site_type: str, cap: Optional[int] = None) -> List[str]:
     """Fetch page via Firecrawl and extract image URLs from HTML."""
-    api_key = sys.argv[3]
+    api_key = os.getenv("FIRECRAWL_API_KEY", "")
     if not api_key:
         return []
 
     try:
-        fc = Firecrawl(api_key=api_key)
+        fc = _get_fc(api_key)
         doc = fc.scrape(
             page_url, 
             formats=["html"], 
@@ -200,98 +333,191 @@ def extract_images_from_html(page_url: str, site_type: str) -> List[str]:
     except Exception:
         return []
 
-    # Extract image URLs from HTML
-    candidates: List[str] = []
-    
-    # Find <img src="...">
-    for m in re.finditer(r"<img[^>]+src=\"([^\"]+)\"", html, re.IGNORECASE):
-        src = m.group(1)
-        if src.startswith("//"):
-            src = "https:" + src
-        elif src.startswith("/"):
-            src = urljoin(page_url, src)
-        elif not src.startswith("http"):
-            src = urljoin(page_url, src)
-        candidates.append(src)
-
-    # Find data-src="..."
-    for m in re.finditer(r"data-src=\"([^\"]+)\"", html, re.IGNORECASE):
-        src = m.group(1)
-        if src.startswith("//"):
-            src = "https:" + src
-        elif src.startswith("/"):
-            src = urljoin(page_url, src)
-        elif not src.startswith("http"):
-            src = urljoin(page_url, src)
-        candidates.append(src)
-
-    # Filter and dedupe
-    filtered = [u for u in candidates if is_likely_listing_image(u, site_type)]
-    unique = list(dict.fromkeys(filtered))
+    return _images_from_html_text(html, page_url, site_type, cap=cap)
 
+
+def _images_from_html_text(html: str, page_url: str, site_type: str, cap: Optional[int] = None) -> List[str]:
+    """Extract likely listing image URLs from an already-fetched HTML page."""
+    # The whole page is scanned at once; _dedup_capped stops consuming matches
+    # once the tier's cap is met. Compass needs every variant for dedup.
     if site_type == "compass":
-        return deduplicate_compass_images(unique)
-    
-    return unique
+        return deduplicate_compass_images(_dedup_capped(_iter_html_image_urls(html, page_url, site_type)))
+    return _dedup_capped(_iter_html_image_urls(html, page_url, site_type), cap)
+
+
+# Optional Hyperscan (DFA) prefilter for multi-MB pages: it reports match start
+# offsets in one streaming pass, then a tiny anchored regex reads the value.
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+_IMG_VALUE_RES_B = tuple(re.compile(r.pattern.encode("ascii"), re.IGNORECASE) for r in _IMG_VALUE_RES)
+
+
+def _build_hs_db() -> Any:
+    db = hyperscan.Database()
+    db.compile(
+        expressions=[r.pattern for r in _IMG_VALUE_RES_B],
+        ids=list(range(len(_IMG_VALUE_RES_B))),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST] * len(_IMG_VALUE_RES_B),
+    )
+    return db
+
+
+_HS_DB = _build_hs_db() if hyperscan is not None else None
+
+
+def _iter_img_src_values(html: str) -> Iterator[str]:
+    """Yield raw <img src>/data-src attribute values in page order."""
+    if _HS_DB is None:
+        # same matches as the Hyperscan path: both patterns, merged by start offset
+        found = sorted(
+            (m.start(), pat_id, m.group(1))
+            for pat_id, rx in enumerate(_IMG_VALUE_RES)
+            for m in rx.finditer(html)
+        )
+        for _, _, src in found:
+            yield src
+        return
+
+    buf = html.encode("utf-8", "ignore")
+    hits: set = set()
+
+    def _on_match(pat_id: int, start: int, end: int, flags: int, context: Any) -> None:
+        hits.add((start, pat_id))
+
+    _HS_DB.scan(buf, match_event_handler=_on_match)
+    for start, pat_id in sorted(hits):
+        m = _IMG_VALUE_RES_B[pat_id].match(buf, start)
+        if m:
+            yield m.group(1).decode("utf-8", "ignore")
+
+
+_cached_urljoin = functools.lru_cache(maxsize=4096)(urljoin)
+
+
+def _abs_url(src: str, page_url: str) -> str:
+    """Make an attribute URL absolute; only relative paths go through urljoin."""
+    if src[:2] == "//":
+        return "https:" + src
+    if src[:4] == "http":
+        return src
+    return _cached_urljoin(page_url, src)
+
+
+def _iter_html_image_urls(html: str, page_url: str, site_type: str) -> Iterator[str]:
+    """Yield absolute, filtered image URLs in page order (duplicates included)."""
+    is_img = SITE_FILTERS.get(site_type, SITE_FILTERS["unknown"]).match
+    # <img src> and data-src in one pass
+    for src in _iter_img_src_values(html):
+        src = _abs_url(src, page_url)
+        if is_img(src):
+            yield src
+
+
+def _coerce_json(doc: Any) -> Any:
+    """Structured payload of a Firecrawl JSON-format result (``{}`` when absent/invalid)."""
+    d = getattr(doc, "json", None)
+    if not d:
+        d = getattr(doc, "data", None)
+    if isinstance(d, (bytes, str)):
+        try:
+            return _json_loads(d)
+        except Exception:
+            return {}
+    return d or {}
+
+
+BASIC_PROMPT = "Extract all high-resolution property image URLs from this listing."
+
+FULL_PROMPT = (
+    "Extract detailed property information including full address (street, city, state, zip), "
+    "price, bedrooms/beds, bathrooms/baths, square footage/sqft, property type, lot size, year built, "
+    "days on market, MLS number, listing agent details (name, company/brokerage, phone, email), "
+    "property description, and all image URLs."
+)
 
 
 # ============================================================================
-# BASIC TIER SCRAPER
+# SHARED TIER CORE
 # ============================================================================
 
-def scrape_basic_tier(url: str) -> Dict[str, Any]:
+def _scrape(url: str, *, tier: str, prompt: str, image_limit: Optional[int], full_gallery: bool,
+            include_property_data: bool = True) -> Dict[str, Any]:
     """
-    BASIC TIER: Fast image-only extraction.
-    
-    Returns up to 6 images with minimal metadata.
-    Uses 1-hour cache for faster performance.
+    Run one Firecrawl JSON extraction and collect images for a tier.
+
+    With ``full_gallery`` the HTML gallery is always scraped and merged ahead of
+    the property-data images; otherwise HTML is only a fallback when fewer than
+    4 images were found, and the result is capped at ``image_limit``.
+    ``include_property_data=False`` leaves out (and skips normalizing)
+    ``property_data`` / ``raw_data``.
     """
     api_key = os.getenv("FIRECRAWL_API_KEY", "")
     if not api_key:
         raise ValueError("FIRECRAWL_API_KEY environment variable is required")
 
     site_type = detect_site(url)
-    fc = Firecrawl(api_key=api_key)
+    fc = _get_fc(api_key)
 
-    # Fast image-only extraction
-    prompt = "Extract all high-resolution property image URLs from this listing."
-    
     try:
-        from firecrawl.v2.types import JsonFormat
         doc = fc.scrape(
             url,
-            formats=[JsonFormat(type="json", prompt=prompt)],
+            formats=_json_formats(prompt),
             only_main_content=True,
-            max_age=3600000  # 1 hour cache for 500% speedup
+            max_age=3600000  # 1 hour cache
         )
-        
-        property_data = getattr(doc, "json", None) or getattr(doc, "data", None) or {}
-        if isinstance(property_data, str):
-            try:
-                property_data = json.loads(property_data)
-            except Exception:
-                property_data = {}
+
+        property_data = _coerce_json(doc)
     except Exception as e:
         raise RuntimeError(f"Firecrawl extraction failed: {e}")
 
     # Extract initial images from property data
-    images = extract_images_from_property_data(property_data, site_type)[:10]
-
-    # If we got less than 4 images, try HTML fallback
-    if len(images) < 4:
-        html_images = extract_images_from_html(url, site_type)
-        images = list(dict.fromkeys([*images, *html_images]))
+    initial_images = extract_images_from_property_data(
+        property_data, site_type, cap=None if full_gallery else image_limit
+    )
 
-    # Limit to 6 images for basic tier
-    images = images[:6]
+    if full_gallery:
+        # Merge images (prioritize HTML gallery as it's usually more complete)
+        all_images = extract_images_from_html(url, site_type)
+        images = _dedup_capped([*all_images, *initial_images])
+        extraction_source = "full_gallery"
+    else:
+        initial_images = initial_images[:image_limit]
+        images = initial_images
+        # If we got less than 4 images, try HTML fallback
+        if len(initial_images) < 4:
+            html_images = extract_images_from_html(url, site_type, cap=image_limit)
+            images = _dedup_capped([*initial_images, *html_images], image_limit)
+        extraction_source = "initial_only" if len(initial_images) >= 4 else "property_data+html_fallback"
 
-    return {
+    result = {
         "images": images,
         "image_count": len(images),
         "site_type": site_type,
-        "tier": "basic",
-        "extraction_source": "initial_only" if len(images) >= 4 else "property_data+html_fallback"
+        "tier": tier,
+        "extraction_source": extraction_source,
     }
+    if include_property_data:
+        result["property_data"] = _normalize_property_data(property_data, site_type)
+        result["raw_data"] = property_data
+    return result
+
+
+# ============================================================================
+# BASIC TIER SCRAPER
+# ============================================================================
+
+def scrape_basic_tier(url: str) -> Dict[str, Any]:
+    """
+    BASIC TIER: Fast image-only extraction.
+    
+    Returns up to 6 images with minimal metadata.
+    Uses 1-hour cache for faster performance.
+    """
+    return _scrape(url, tier="basic", prompt=BASIC_PROMPT, image_limit=6, full_gallery=False,
+                   include_property_data=False)
 
 
 # ============================================================================
@@ -305,50 +531,67 @@ def scrape_full_tier(url: str) -> Dict[str, Any]:
     Returns all available images and detailed property information.
     Uses 1-hour cache for faster performance.
     """
-    api_key = sys.argv[3]
-    if not api_key:
-        raise ValueError("FIRECRAWL_API_KEY environment variable is required")
+    return _scrape(url, tier="full", prompt=FULL_PROMPT, image_limit=None, full_gallery=True)
+
+
+# ============================================================================
+# ASYNC FULL TIER
+# ============================================================================
+
+def _async_scraper(fc: Any) -> Callable[..., Awaitable[Any]]:
+    """
+    Resolve once per client how to call ``fc.scrape`` without blocking the loop:
+    natively when it is a coroutine function, otherwise in a worker thread.
+    """
+    if inspect.iscoroutinefunction(fc.scrape):
+        return fc.scrape
+    return functools.partial(asyncio.to_thread, fc.scrape)
+
+
+async def scrape_full_tier_async(url: str, fc: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    FULL TIER (async): same output as ``scrape_full_tier``.
 
+    The JSON extraction and the HTML gallery scrape for the URL run concurrently.
+    """
+    if fc is None:
+        api_key = os.getenv("FIRECRAWL_API_KEY", "")
+        if not api_key:
+            raise ValueError("FIRECRAWL_API_KEY environment variable is required")
+        fc = AsyncFirecrawl(api_key=api_key) if AsyncFirecrawl else _get_fc(api_key)
+    return await _full_tier_async(url, _async_scraper(fc))
+
+
+async def _full_tier_async(url: str, scrape: Callable[..., Awaitable[Any]]) -> Dict[str, Any]:
     site_type = detect_site(url)
-    fc = Firecrawl(api_key=api_key)
-
-    # Comprehensive property data extraction
-    prompt = (
-        "Extract detailed property information including full address (street, city, state, zip), "
-        "price, bedrooms/beds, bathrooms/baths, square footage/sqft, property type, lot size, year built, "
-        "days on market, MLS number, listing agent details (name, company/brokerage, phone, email), "
-        "property description, and all image URLs."
-    )
-    
-    try:
-        from firecrawl.v2.types import JsonFormat
-        doc = fc.scrape(
+
+    async def _json_scrape() -> Any:
+        # formats are built inside the task so a schema error is reported like a failed scrape
+        return await scrape(
             url,
-            formats=[JsonFormat(type="json", prompt=prompt)],
+            formats=_json_formats(FULL_PROMPT),
             only_main_content=True,
             max_age=3600000  # 1 hour cache
         )
-        
-        property_data = getattr(doc, "json", None) or getattr(doc, "data", None) or {}
-        if isinstance(property_data, str):
-            try:
-                property_data = json.loads(property_data)
-            except Exception:
-                property_data = {}
-    except Exception as e:
-        raise RuntimeError(f"Firecrawl extraction failed: {e}")
 
-    # Extract initial images from property data
+    json_task = asyncio.create_task(_json_scrape())
+    html_task = asyncio.create_task(scrape(
+        url,
+        formats=["html"],
+        only_main_content=True,
+        max_age=3600000  # 1 hour cache
+    ))
+    json_doc, html_doc = await asyncio.gather(json_task, html_task, return_exceptions=True)
+
+    if isinstance(json_doc, BaseException):
+        raise RuntimeError(f"Firecrawl extraction failed: {json_doc}")
+    property_data = _coerce_json(json_doc)
+
+    # HTML gallery failures degrade to property-data images, as in the sync tier
+    html = "" if isinstance(html_doc, BaseException) else (getattr(html_doc, "html", None) or "")
+    all_images = _images_from_html_text(html, url, site_type) if html else []
     initial_images = extract_images_from_property_data(property_data, site_type)
-
-    # Full gallery scrape from HTML
-    all_images = extract_images_from_html(url, site_type)
-    
-    # Merge images (prioritize HTML gallery as it's usually more complete)
-    images = list(dict.fromkeys([*all_images, *initial_images]))
-
-    # Normalize property data
-    extracted = _normalize_property_data(property_data, site_type)
+    images = _dedup_capped([*all_images, *initial_images])
 
     return {
         "images": images,
@@ -356,11 +599,31 @@ def scrape_full_tier(url: str) -> Dict[str, Any]:
         "site_type": site_type,
         "tier": "full",
         "extraction_source": "full_gallery",
-        "property_data": extracted,
+        "property_data": _normalize_property_data(property_data, site_type),
         "raw_data": property_data
     }
 
 
+async def scrape_many_async(urls: List[str], concurrency: int = 32) -> List[Any]:
+    """
+    Run the async FULL tier over many URLs, at most ``concurrency`` in flight.
+
+    Results keep the input order; a failed URL yields its exception instead of a dict.
+    """
+    api_key = os.getenv("FIRECRAWL_API_KEY", "")
+    if not api_key:
+        raise ValueError("FIRECRAWL_API_KEY environment variable is required")
+    fc = AsyncFirecrawl(api_key=api_key) if AsyncFirecrawl else _get_fc(api_key)
+    scrape = _async_scraper(fc)
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _one(u: str) -> Dict[str, Any]:
+        async with sem:
+            return await _full_tier_async(u, scrape)
+
+    return await asyncio.gather(*[_one(u) for u in urls], return_exceptions=True)
+
+
 # ============================================================================
 # EFFICIENT TIER SCRAPER
 # ============================================================================
@@ -372,66 +635,47 @@ def scrape_efficient_tier(url: str) -> Dict[str, Any]:
     Returns up to 6 high-quality images and detailed property information.
     Uses 1-hour cache for faster performance.
     """
-    api_key = sys.argv[3]
-    if not api_key:
-        raise ValueError("FIRECRAWL_API_KEY environment variable is required")
+    return _scrape(url, tier="efficient", prompt=FULL_PROMPT, image_limit=6, full_gallery=False)
 
-    site_type = detect_site(url)
-    fc = Firecrawl(api_key=api_key)
-
-    # Comprehensive property data extraction
-    prompt = (
-        "Extract detailed property information including full address (street, city, state, zip), "
-        "price, bedrooms/beds, bathrooms/baths, square footage/sqft, property type, lot size, year built, "
-        "days on market, MLS number, listing agent details (name, company/brokerage, phone, email), "
-        "property description, and all image URLs."
-    )
-    
-    try:
-        from firecrawl.v2.types import JsonFormat
-        doc = fc.scrape(
-            url,
-            formats=[JsonFormat(type="json", prompt=prompt)],
-            only_main_content=True,
-            max_age=3600000  # 1 hour cache
-        )
-        
-        property_data = getattr(doc, "json", None) or getattr(doc, "data", None) or {}
-        if isinstance(property_data, str):
-            try:
-                property_data = json.loads(property_data)
-            except Exception:
-                property_data = {}
-    except Exception as e:
-        raise RuntimeError(f"Firecrawl extraction failed: {e}")
 
-    # Extract initial images from property data (limited to 6)
-    initial_images = extract_images_from_property_data(property_data, site_type)[:6]
+# ============================================================================
+# BATCH SCRAPING
+# ============================================================================
 
-    # If we got less than 4 images, try HTML fallback
-    if len(initial_images) < 4:
-        html_images = extract_images_from_html(url, site_type)
-        images = list(dict.fromkeys([*initial_images, *html_images]))[:6]
-    else:
-        images = initial_images
+_TIER_FUNCS = {
+    "basic": scrape_basic_tier,
+    "efficient": scrape_efficient_tier,
+    "full": scrape_full_tier,
+}
 
-    # Normalize property data
-    extracted = _normalize_property_data(property_data, site_type)
 
-    return {
-        "images": images,
-        "image_count": len(images),
-        "site_type": site_type,
-        "tier": "efficient",
-        "extraction_source": "initial_only" if len(initial_images) >= 4 else "property_data+html_fallback",
-        "property_data": extracted,
-        "raw_data": property_data
-    }
+def scrape_many(urls: List[str], tier: str = "basic", workers: int = 32) -> List[Dict[str, Any]]:
+    """
+    Scrape many URLs with one tier on a thread pool.
+
+    All workers share the cached Firecrawl client, so keep ``workers`` at or
+    below its connection pool size. Results follow the input order; a failed
+    URL yields ``{"url": ..., "error": ...}``.
+    """
+    fn = _TIER_FUNCS.get(tier, scrape_full_tier)
+    results: List[Dict[str, Any]] = [{} for _ in urls]
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        fut_to_idx = {ex.submit(fn, u): i for i, u in enumerate(urls)}
+        for fut in as_completed(fut_to_idx):
+            i = fut_to_idx[fut]
+            try:
+                results[i] = fut.result()
+            except Exception as e:
+                results[i] = {"url": urls[i], "error": str(e)}
+    return results
 
 
 def _normalize_property_data(raw: Optional[Dict[str, Any]], site_type: str) -> Dict[str, Any]:
     """Normalize property data from different sources."""
     raw = raw or {}
+    _agent = raw.get("agent")
+    agent = _agent if isinstance(_agent, dict) else {}
+    _zip = raw.get("zip") or raw.get("zipcode") or ""
 
     # Handle address - can be string or nested object
     address_value = raw.get("address")
@@ -439,17 +683,17 @@ def _normalize_property_data(raw: Optional[Dict[str, Any]], site_type: str) -> D
         full_address = address_value
         city = raw.get("city", "")
         state = raw.get("state", "")
-        zip_code = raw.get("zip") or raw.get("zipcode", "")
+        zip_code = _zip
     elif isinstance(address_value, dict):
         full_address = address_value.get("street") or address_value.get("line1", "")
         city = address_value.get("city") or raw.get("city", "")
         state = address_value.get("state") or raw.get("state", "")
-        zip_code = (address_value.get("zip") or address_value.get("zipcode") or raw.get("zip") or raw.get("zipcode", ""))
+        zip_code = address_value.get("zip") or address_value.get("zipcode") or _zip
     else:
         full_address = raw.get("fullAddress", "")
         city = raw.get("city", "")
         state = raw.get("state", "")
-        zip_code = raw.get("zip") or raw.get("zipcode", "")
+        zip_code = _zip
 
     # Handle price - can be string, number, or nested object
     price_value = raw.get("price")
@@ -478,10 +722,10 @@ def _normalize_property_data(raw: Optional[Dict[str, Any]], site_type: str) -> D
         "mlsNumber": raw.get("mls_number") or raw.get("mlsNumber", ""),
         "description": (raw.get("description") or raw.get("propertyDescription") or raw.get("summary", "")),
         "agent": {
-            "name": raw.get("agent", {}).get("name", "") if isinstance(raw.get("agent"), dict) else "",
-            "company": raw.get("agent", {}).get("company", "") if isinstance(raw.get("agent"), dict) else "",
-            "phone": raw.get("agent", {}).get("phone", "") if isinstance(raw.get("agent"), dict) else "",
-            "email": raw.get("agent", {}).get("email", "") if isinstance(raw.get("agent"), dict) else ""
+            "name": agent.get("name", ""),
+            "company": agent.get("company", ""),
+            "phone": agent.get("phone", ""),
+            "email": agent.get("email", "")
         },
         "siteType": site_type,
     }
@@ -501,6 +745,7 @@ if __name__ == "__main__":
     url = sys.argv[1]
     tier = sys.argv[2] if len(sys.argv) > 3 else "basic"
     api_key = sys.argv[3]
+    os.environ["FIRECRAWL_API_KEY"] = api_key
 
     if tier == "basic":
         result = scrape_basic_tier(url)
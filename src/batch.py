@@ -1,56 +1,63 @@
 # src/batch.py
 # Purpose: Initialize a new batch with ID, folders, and seed search pages.
 
-import json
-from src.settings import CFG, make_batch_dirs, today_ymd, now_utc_iso
+import sys
+from typing import Dict, List, Optional
+from src.settings import CFG, make_batch_dirs, today_ymd, now_utc_iso, write_json
+
+def _pages_for_zip(z: Dict[str, str], redfin_tmpl: Optional[str], zillow_tmpl: Optional[str],
+                   crawl_method: str) -> List[Dict[str, str]]:
+    """Search-page seeds for one ZIP (Redfin first, then Zillow)."""
+    return [
+        {
+            "source_id": source_id,
+            "zip": z["zip"],
+            "city": z["city"],
+            "state": z["state"],
+            "crawl_method": crawl_method,
+            "url": tmpl.format(ZIP=z["zip"])
+        }
+        for source_id, tmpl in (("redfin", redfin_tmpl), ("zillow", zillow_tmpl))
+        if tmpl is not None
+    ]
 
 def init_batch() -> str:
     """
     Create new batch folders and seed search pages file.
     Returns: BATCH_ID
     """
+    # city/state are read per area from the config and repeat across every
+    # seed; intern them so all seed dicts share one string object per value.
+    intern = sys.intern
+
     # ---- Derive ZIP list from areas ----
     zip_codes = []
     for area in CFG.get("areas", []):
+        city = intern(area["city"])
+        state = intern(area["state"])
         for z in area.get("zips", []):
             zip_codes.append({
-                "city": area["city"],
-                "state": area["state"],
-                "zip": z
-            })
-
-    # ---- Build search pages (per platform per ZIP) ----
-    search_pages = []
-    for z in zip_codes:
-        zip_code = z["zip"]
-        city = z["city"]
-        state = z["state"]
-
-        if "redfin" in CFG["seeds"]:
-            search_pages.append({
-                "source_id": "redfin",
-                "zip": zip_code,
                 "city": city,
                 "state": state,
-                "crawl_method": CFG.get("crawl_method", "firecrawl_v1"),
-                "url": CFG["seeds"]["redfin"]["zip_search"].format(ZIP=zip_code)
+                "zip": z
             })
 
-        if "zillow" in CFG["seeds"]:
-            search_pages.append({
-                "source_id": "zillow",
-                "zip": zip_code,
-                "city": city,
-                "state": state,
-                "crawl_method": CFG.get("crawl_method", "firecrawl_v1"),
-                "url": CFG["seeds"]["zillow"]["zip_search"].format(ZIP=zip_code)
-            })
+    # ---- Build search pages (per platform per ZIP) ----
+    seeds = CFG["seeds"]
+    redfin_tmpl = seeds["redfin"]["zip_search"] if "redfin" in seeds else None
+    zillow_tmpl = seeds["zillow"]["zip_search"] if "zillow" in seeds else None
+    crawl_method = CFG.get("crawl_method", "firecrawl_v1")
+    search_pages = [
+        page
+        for z in zip_codes
+        for page in _pages_for_zip(z, redfin_tmpl, zillow_tmpl, crawl_method)
+    ]
 
     # ---- Optional hardcoded detail URLs ----
     detail_pages = [
         {"source_id": "unknown", "url": u,
-         "crawl_method": CFG.get("crawl_method", "firecrawl_v1")}
-        for u in CFG["seeds"].get("detail_urls", [])
+         "crawl_method": crawl_method}
+        for u in seeds.get("detail_urls", [])
     ]
 
     # ---- Create batch_id and dirs ----
@@ -71,7 +78,7 @@ def init_batch() -> str:
         "search_pages": search_pages,
         "detail_pages": detail_pages
     }
-    seeds_path.write_text(json.dumps(seeds_obj, indent=2, ensure_ascii=False), encoding="utf-8")
+    write_json(seeds_path, seeds_obj)
 
     print(f"✅ Batch {BATCH_ID} ready at {dirs['base'].resolve()}")
     print(f"Seeds file: {seeds_path}")
@@ -7,16 +7,30 @@
 # - Writes search_extraction_summary.json with counters.
 
 from __future__ import annotations
-import json
+import hashlib
 import re
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterator, Optional, Tuple
 from collections import defaultdict
-from src.settings import PROJECT_ROOT
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from functools import lru_cache
+from selectolax.lexbor import LexborHTMLParser
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+    if ijson.backend == "python":  # pure-Python backend is far slower than a full parse
+        ijson = None
+except ImportError:
+    ijson = None
+from src.settings import PROJECT_ROOT, json_loads, read_json, write_json
 from src.pipeline import latest_batch_dir
 
 BATCHES_ROOT = PROJECT_ROOT / "data" / "batches"
 
+# blobs at least this big are streamed with ijson (bounded memory) instead of fully decoded
+STREAM_JSON_MIN_BYTES = 8 * 1024 * 1024
+
 # -------- Helpers -------- 
 
 def read_text(p: Path) -> str:
@@ -31,12 +45,45 @@ def looks_like_zillow(html: str) -> bool:
 def looks_like_redfin(html: str) -> bool:
     return "Redfin" in html or "redfin.com" in html
 
+BLOCKED_RE = re.compile(r"px-captcha|Access to this page has been denied|PerimeterX")
+# Redfin 404 UX (“Oops… lost that one.”)
+NOT_FOUND_RE = re.compile(r"NotFoundPage route-NotFoundPage|Oops… lost that one\.")
+PAGE_CLASS_RE = re.compile(f"(?P<blocked>{BLOCKED_RE.pattern})|(?P<not_found>{NOT_FOUND_RE.pattern})")
+
 def is_perimeterx_captcha(html: str) -> bool:
-    return "px-captcha" in html or "Access to this page has been denied" in html or "PerimeterX" in html
+    return BLOCKED_RE.search(html) is not None
 
 def is_redfin_not_found(html: str) -> bool:
-    # Redfin 404 UX (“Oops… lost that one.”)
-    return 'NotFoundPage route-NotFoundPage' in html or "Oops… lost that one." in html
+    return NOT_FOUND_RE.search(html) is not None
+
+def classify_page(html: str) -> Optional[str]:
+    """'blocked' | 'not_found' | None in one scan (blocked wins if both markers are present)."""
+    m = PAGE_CLASS_RE.search(html)
+    if m is None:
+        return None
+    if m.lastgroup == "blocked" or BLOCKED_RE.search(html, m.end()):
+        return "blocked"
+    return "not_found"
+
+# closing tag may be written in any case (</SCRIPT>), as the old IGNORECASE patterns allowed;
+# a case-insensitive search keeps offsets valid where str.lower() could change the length
+SCRIPT_CLOSE_RE = re.compile(r"</script>", re.I)
+
+def script_text_by_id(html: str, script_id: str) -> Optional[str]:
+    """Body of <script ... id="script_id" ...>…</script> via linear scans (find + one close-tag search)."""
+    needle = f'id="{script_id}"'
+    i = html.find(needle)
+    while i != -1:
+        lt = html.rfind("<", 0, i)
+        # the id must sit inside an opening <script ...> tag
+        if lt != -1 and html[lt:lt + 7].lower() == "<script" and ">" not in html[lt:i]:
+            j = html.find(">", i + len(needle))
+            m = SCRIPT_CLOSE_RE.search(html, j + 1) if j != -1 else None
+            if m is None:
+                return None
+            return html[j + 1:m.start()] or None
+        i = html.find(needle, i + 1)
+    return None
 
 def strip_ws(s: Optional[str]) -> Optional[str]:
     if s is None: 
@@ -44,131 +91,259 @@ def strip_ws(s: Optional[str]) -> Optional[str]:
     s2 = s.strip()
     return s2 if s2 else None
 
+@lru_cache(maxsize=64)
+def origin_for(base: str) -> Optional[str]:
+    # Pick domain from base — resolved once per distinct base, not per href
+    if "zillow.com" in base:
+        return "https://www.zillow.com"
+    if "redfin.com" in base:
+        return "https://www.redfin.com"
+    return None
+
 def to_abs(url: str, base: str) -> str:
     if url.startswith("http"):
         return url
     if url.startswith("//"):
         return "https:" + url
     if url.startswith("/"):
-        # Pick domain from base
-        if "zillow.com" in base:
-            return "https://www.zillow.com" + url
-        if "redfin.com" in base:
-            return "https://www.redfin.com" + url
+        origin = origin_for(base)
+        if origin:
+            return origin + url
     return url
 
 # -------- Zillow parsing -------- 
 
-NEXT_DATA_RE = re.compile(
-    r'<script[^>]+id="__NEXT_DATA__"[^>]*>(?P<json>[\s\S]+?)</script>',
-    re.IGNORECASE
+# Known paths only — no walk over the rest of the (multi-MB) Next.js state
+ZILLOW_RESULT_PATHS = (
+    ("props", "pageProps", "searchPageState", "cat1", "searchResults", "listResults"),
+    ("props", "pageProps", "searchPageState", "cat1", "searchResults", "mapResults"),
 )
 
+def dig(obj: Any, path) -> Any:
+    cur = obj
+    for k in path:
+        if not isinstance(cur, dict) or k not in cur:
+            return None
+        cur = cur[k]
+    return cur
+
+def stream_zillow_results(blob: bytes) -> List[List[Any]]:
+    """One ijson pass → the items under each ZILLOW_RESULT_PATHS array (nothing else is built)."""
+    wanted = {".".join(p) + ".item": i for i, p in enumerate(ZILLOW_RESULT_PATHS)}
+    arrays: List[List[Any]] = [[] for _ in ZILLOW_RESULT_PATHS]
+    builder = None
+    cur = None
+    for prefix, event, value in ijson.parse(blob):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == cur and event == "end_map":
+                arrays[wanted[cur]].append(builder.value)
+                builder = None
+        elif event == "start_map" and prefix in wanted:
+            builder = ObjectBuilder()
+            builder.event(event, value)
+            cur = prefix
+    return arrays
+
 def parse_zillow_listings_from_next_data(html: str) -> List[str]:
     """
     Returns absolute detail URLs from Zillow __NEXT_DATA__ JSON.
     """
-    m = NEXT_DATA_RE.search(html)
-    if not m:
+    blob = script_text_by_id(html, "__NEXT_DATA__")
+    if not blob:
         return []
 
-    try:
-        data = json.loads(m.group("json"))
-    except Exception:
-        return []
-
-    # Known path:
-    # data["props"]["pageProps"]["searchPageState"]["cat1"]["searchResults"]["listResults"]
-    # or mapResults
-    def dig(obj: Any, path: List[str]) -> Any:
-        cur = obj
-        for k in path:
-            if not isinstance(cur, dict) or k not in cur:
-                return None
-            cur = cur[k]
-        return cur
-
-    paths = [
-        ["props","pageProps","searchPageState","cat1","searchResults","listResults"],
-        ["props","pageProps","searchPageState","cat1","searchResults","mapResults"],
-    ]
-
-    urls: List[str] = []
-    for path in paths:
-        arr = dig(data, path)
-        if isinstance(arr, list):
-            for item in arr:
-                # common fields
-                detail_url = item.get("detailUrl") or item.get("hdpUrl")
-                if detail_url:
-                    urls.append(to_abs(detail_url, "https://www.zillow.com"))
-                else:
-                    # fallback by zpid if present (construct)
-                    zpid = item.get("zpid")
-                    if zpid:
-                        urls.append(f"https://www.zillow.com/homedetails/{zpid}_zpid")
-    # Dedup preserve order
-    seen = set()
-    out = []
-    for u in urls:
-        if u not in seen:
-            seen.add(u)
-            out.append(u)
-    return out
-
-# -------- Redfin parsing -------- 
+    arrays: Optional[List[Any]] = None
+    if ijson is not None and len(blob) >= STREAM_JSON_MIN_BYTES:
+        try:
+            arrays = stream_zillow_results(blob.encode("utf-8"))
+        except Exception:
+            arrays = None
+        if arrays is not None and not any(arrays):
+            arrays = None  # prefix absent → full parse below
+    if arrays is None:
+        try:
+            data = json_loads(blob)
+        except Exception:
+            return []
+        arrays = [dig(data, path) for path in ZILLOW_RESULT_PATHS]
 
-STATE_PATTERNS = [
-    re.compile(r'window\.__REDUX_STATE__\s*=\s*(\{[\s\S]+?\});', re.IGNORECASE),
-    re.compile(r'window\.__BOOTSTRAP_STATE__\s*=\s*(\{[\s\S]+?\});', re.IGNORECASE),
-    re.compile(r'<script[^>]+id="__REDUX_STATE__"[^>]*>([\s\S]+?)</script>', re.IGNORECASE),
-]
+    # single pass: clean + dedup while iterating (no intermediate URL list)
+    return list(dict.fromkeys(iter_zillow_result_urls(arrays)))
 
-#any href with /home/{id}
-HREF_ANY_HOME_RE = re.compile(r'href="(?P<href>[^"]*/home/\d+[^"]*?)"', re.IGNORECASE)
+def iter_zillow_result_urls(arrays) -> Iterator[str]:
+    for arr in arrays:
+        if not isinstance(arr, list):
+            continue
+        for item in arr:
+            if not isinstance(item, dict):
+                continue
+            # common fields
+            detail_url = item.get("detailUrl") or item.get("hdpUrl")
+            if detail_url:
+                yield to_abs(detail_url, "https://www.zillow.com")
+            else:
+                # fallback by zpid if present (construct)
+                zpid = item.get("zpid")
+                if zpid:
+                    yield f"https://www.zillow.com/homedetails/{zpid}_zpid"
 
-def parse_redfin_listings(html: str) -> List[str]:
-    urls: List[str] = []
+# -------- Redfin parsing -------- 
 
-    # 1) جرّب JSON state
-    for pat in STATE_PATTERNS:
-        m = pat.search(html)
+# window.X = {...}; one alternation finds both assignments in a single scan,
+# the object is then sliced with a brace counter (no backtracking)
+STATE_ASSIGN_RE = re.compile(r'window\.__(REDUX|BOOTSTRAP)_STATE__\s*=\s*', re.IGNORECASE)
+STATE_ASSIGN_ORDER = ("REDUX", "BOOTSTRAP")
+
+# a whole JSON string literal (escapes honoured) or a single brace
+JSON_BRACE_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[{}]')
+
+def balanced_object_end(text: str, start: int) -> int:
+    """Index just past the '}' closing the object opened at text[start], or -1."""
+    depth = 0
+    for m in JSON_BRACE_TOKEN_RE.finditer(text, start):
+        tok = m.group()
+        if tok == "{":
+            depth += 1
+        elif tok == "}":
+            depth -= 1
+            if depth == 0:
+                return m.end()
+    return -1
+
+# Optional JIT brace scanner (one tight byte loop instead of a regex match per token).
+# numba is not a hard dependency; without it balanced_object_end is used.
+try:
+    import numba
+except ImportError:
+    numba = None
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _brace_end_kernel(buf):
+        depth = 0
+        in_str = False
+        esc = False
+        for i in range(len(buf)):
+            c = buf[i]
+            if in_str:
+                if esc:
+                    esc = False
+                elif c == 92:    # backslash
+                    esc = True
+                elif c == 34:    # "
+                    in_str = False
+            elif c == 34:
+                in_str = True
+            elif c == 123:       # {
+                depth += 1
+            elif c == 125:       # }
+                depth -= 1
+                if depth == 0:
+                    return i + 1
+        return -1
+
+def balanced_object_at(text: str, start: int) -> Optional[str]:
+    """The JSON object text starting at text[start] ('{'), or None if it never closes."""
+    if numba is not None:
+        buf = text[start:].encode("utf-8")
+        end = _brace_end_kernel(buf)
+        return buf[:end].decode("utf-8") if end != -1 else None
+    end = balanced_object_end(text, start)
+    return text[start:end] if end != -1 else None
+
+def redfin_state_blobs(html: str):
+    # first assignment of each name counts; the scan resumes past an extracted
+    # object, so names mentioned inside it are never re-sliced
+    found: Dict[str, Optional[str]] = {}
+    pos = 0
+    while len(found) < len(STATE_ASSIGN_ORDER):
+        m = STATE_ASSIGN_RE.search(html, pos)
         if not m:
+            break
+        pos = m.end()
+        name = m.group(1).upper()
+        if name in found:
             continue
-        blob = m.group(1).strip()
+        found[name] = None
+        if not html.startswith("{", pos):
+            continue
+        blob = balanced_object_at(html, pos)
+        if blob is not None:
+            found[name] = blob
+            pos += len(blob)
+    for name in STATE_ASSIGN_ORDER:
+        if found.get(name) is not None:
+            yield found[name]
+    # script-tag form stops at the tag boundary
+    blob = script_text_by_id(html, "__REDUX_STATE__")
+    if blob:
+        blob = blob.strip()
         if blob.endswith(";"):
             blob = blob[:-1]
+        yield blob
+
+#any href with /home/{id}
+HOME_PATH_RE = re.compile(r'/home/\d+')
+
+def stream_redfin_home_urls(blob: bytes) -> List[str]:
+    """ijson pass: dict string values containing /home/, in document order (same as the DFS below)."""
+    found: List[str] = []
+    containers: List[str] = []
+    for _, event, value in ijson.parse(blob):
+        if event == "start_map":
+            containers.append("m")
+        elif event == "start_array":
+            containers.append("a")
+        elif event in ("end_map", "end_array"):
+            containers.pop()
+        elif event == "string" and containers and containers[-1] == "m" and "/home/" in value:
+            found.append(value)
+    return found
+
+def iter_redfin_state_urls(html: str) -> Iterator[str]:
+    for blob in redfin_state_blobs(html):
+        if ijson is not None and len(blob) >= STREAM_JSON_MIN_BYTES:
+            try:
+                found = stream_redfin_home_urls(blob.encode("utf-8"))
+            except Exception:
+                found = None
+            if found is not None:
+                yield from found
+                continue
         try:
-            state = json.loads(blob)
+            state = json_loads(blob)
         except Exception:
             continue
 
-        def collect_urls_from_obj(o: Any) -> None:
+        # explicit-stack DFS (preorder): only string values of dicts are URL
+        # candidates, so list-level strings are never pushed
+        stack: List[Any] = [state]
+        while stack:
+            o = stack.pop()
             if isinstance(o, dict):
-                for k, v in o.items():
-                    if isinstance(v, str) and "/home/" in v:
-                        urls.append(to_abs(v, "https://www.redfin.com"))
-                    else:
-                        collect_urls_from_obj(v)
+                stack.extend(reversed([v for v in o.values() if not isinstance(v, str) or "/home/" in v]))
             elif isinstance(o, list):
-                for it in o:
-                    collect_urls_from_obj(it)
+                stack.extend(reversed([it for it in o if not isinstance(it, str)]))
+            elif isinstance(o, str):
+                yield o
+
+def iter_redfin_anchor_urls(html: str) -> Iterator[str]:
+    # كل <a href> فيه /home/{id}
+    for a in LexborHTMLParser(html).css('a[href*="/home/"]'):
+        href = a.attributes.get("href") or ""
+        if HOME_PATH_RE.search(href):
+            yield href
 
-        collect_urls_from_obj(state)
+def parse_redfin_listings(html: str) -> List[str]:
+    # 1) جرّب JSON state — absolutize + dedup in the same pass
+    urls = dict.fromkeys(to_abs(u, "https://www.redfin.com") for u in iter_redfin_state_urls(html))
 
-    # 2) فولباك: regex عام لكل href فيه /home/{id}
+    # 2) فولباك: anchors
     if not urls:
-        for m in HREF_ANY_HOME_RE.finditer(html):
-            urls.append(to_abs(m.group("href"), "https://www.redfin.com"))
-
-    # Dedup
-    seen = set()
-    out = []
-    for u in urls:
-        if u not in seen:
-            seen.add(u)
-            out.append(u)
-    return out
+        urls = dict.fromkeys(to_abs(h, "https://www.redfin.com") for h in iter_redfin_anchor_urls(html))
+
+    return list(urls)
 
 # -------- Orchestrate over batch/raw
 
@@ -185,7 +360,7 @@ def load_seed_map(batch_dir: Path) -> Dict[str, str]:
     if not seed_path.exists():
         return {}
     try:
-        data = json.loads(seed_path.read_text(encoding="utf-8"))
+        data = json_loads(seed_path.read_bytes())
         # expect {"pages":[{"idx":7,"seed_url":"https://..."}, ...]}
         by_idx = {}
         for row in data.get("pages", []):
@@ -197,62 +372,77 @@ def load_seed_map(batch_dir: Path) -> Dict[str, str]:
     except Exception:
         return {}
 
-def main():
+# bump when the parsers change so stale cache entries are ignored
+SEARCH_CACHE_VERSION = 1
+SEARCH_PARSERS = {
+    "zillow": parse_zillow_listings_from_next_data,
+    "redfin": parse_redfin_listings,
+}
+
+def cached_listing_urls(html: str, src: str, cache_dir: Path) -> List[str]:
+    """Parse a search page once per content: URLs are memoized on disk by blake2b(html)."""
+    parser = SEARCH_PARSERS.get(src)
+    if parser is None:
+        return []
+    key = hashlib.blake2b(html.encode("utf-8", "ignore"), digest_size=16).hexdigest()
+    path = cache_dir / f"v{SEARCH_CACHE_VERSION}_{src}_{key}.json"
+    cached = read_json(path)
+    if isinstance(cached, list):
+        return cached
+    urls = parser(html)
+    write_json(path, urls)
+    return urls
+
+def process_page(path: Path, seed_url: Optional[str], cache_dir: Path) -> Tuple[str, str, List[str]]:
+    """One search page → (status, source_id, urls); status is blocked | not_found | empty | ok."""
+    html = read_text(path)
+    page_class = classify_page(html)
+    if page_class:
+        return page_class, "unknown", []
+    src = detect_source_from_html(html, seed_url)
+    urls = cached_listing_urls(html, src, cache_dir)
+    return ("ok" if urls else "empty"), src, urls
+
+def main(workers: Optional[int] = None):
     batch_dir = latest_batch_dir()
     raw_dir = batch_dir / "raw"
     struct_dir = batch_dir / "structured"
     struct_dir.mkdir(parents=True, exist_ok=True)
 
     seed_by_idx = load_seed_map(batch_dir)
+    cache_dir = batch_dir / ".cache" / "search_urls"
 
     listing_urls: List[Dict[str, str]] = []
     counters = defaultdict(int)
     per_source = defaultdict(int)
     pages_meta: List[Dict[str, Any]] = []
 
-    # iterate raw 000*_raw.html (search pages)
-    for p in sorted(raw_dir.glob("0???_raw.html")):
-        idx4 = p.name[:4]
-        html = read_text(p)
-        seed_url = seed_by_idx.get(idx4)
-
-        # classify
-        if is_perimeterx_captcha(html):
-            counters["blocked"] += 1
-            pages_meta.append({"idx": idx4, "status": "blocked", "seed_url": seed_url})
-            continue
-        if is_redfin_not_found(html):
-            counters["not_found"] += 1
-            pages_meta.append({"idx": idx4, "status": "not_found", "seed_url": seed_url})
-            continue
+    # iterate raw 000*_raw.html (search pages) — CPU-bound JSON parsing, one process per core
+    pages = sorted(raw_dir.glob("0???_raw.html"))
+    seeds = [seed_by_idx.get(p.name[:4]) for p in pages]
+    if len(pages) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            outcomes = list(ex.map(process_page, pages, seeds, repeat(cache_dir), chunksize=4))
+    else:
+        outcomes = [process_page(p, seed, cache_dir) for p, seed in zip(pages, seeds)]
 
-        src = detect_source_from_html(html, seed_url)
-        if src == "zillow":
-            urls = parse_zillow_listings_from_next_data(html)
-        elif src == "redfin":
-            urls = parse_redfin_listings(html)
-        else:
-            urls = []
-
-        if urls:
+    for p, seed_url, (status, src, urls) in zip(pages, seeds, outcomes):
+        idx4 = p.name[:4]
+        if status == "ok":
             counters["pages_ok"] += 1
             per_source[src] += 1
             for u in urls:
                 listing_urls.append({"source_id": src, "source_url": u})
         else:
-            # page loaded but no data parsed
-            counters["pages_empty"] += 1
-            pages_meta.append({"idx": idx4, "status": "empty", "seed_url": seed_url})
+            # blocked / not_found / empty (page loaded but no data parsed)
+            counters["pages_empty" if status == "empty" else status] += 1
+            pages_meta.append({"idx": idx4, "status": status, "seed_url": seed_url})
 
     # deduplicate by URL keeping first source_id
-    seen = set()
-    deduped: List[Dict[str,str]] = []
+    by_url: Dict[str, Dict[str, str]] = {}
     for row in listing_urls:
-        u = row["source_url"]
-        if u in seen:
-            continue
-        seen.add(u)
-        deduped.append(row)
+        by_url.setdefault(row["source_url"], row)
+    deduped: List[Dict[str,str]] = list(by_url.values())
 
     # write listing_urls.json in a shape pipeline.load_listing_urls understands
     out_payload = {
@@ -262,10 +452,7 @@ def main():
             for k in sorted(set(r["source_id"] for r in deduped))
         }
     }
-    (struct_dir / "listing_urls.json").write_text(
-        json.dumps(out_payload, ensure_ascii=False, indent=2),
-        encoding="utf-8"
-    )
+    write_json(struct_dir / "listing_urls.json", out_payload)
 
     # summary
     summary = {
@@ -277,10 +464,7 @@ def main():
         "by_source_pages": dict(per_source),
         "pages_meta": pages_meta
     }
-    (batch_dir / "search_extraction_summary.json").write_text(
-        json.dumps(summary, ensure_ascii=False, indent=2),
-        encoding="utf-8"
-    )
+    write_json(batch_dir / "search_extraction_summary.json", summary)
 
     print(f"listing_urls.json: {len(deduped)} (by_source={out_payload['by_source']}), "
           f"pages ok={counters['pages_ok']}, empty={counters['pages_empty']}, "
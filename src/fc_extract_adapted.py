@@ -4,18 +4,20 @@
 from __future__ import annotations
 import os
 import json
-import re
 import time
 import hashlib
+import functools
+import threading
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 from pydantic import BaseModel
 from dotenv import load_dotenv
 from firecrawl import FirecrawlApp
 
-from src.settings import CFG, now_utc_iso, PROJECT_ROOT
+from src.settings import CFG, now_utc_iso, PROJECT_ROOT, to_float, to_int, id_digest, newest_subdir, json_loads, read_json, write_json, write_json_array, write_jsonl
 from src.batch import init_batch
 from src.fetch import fetch_search_pages
 from src.extract_search import extract_listing_urls
@@ -26,110 +28,39 @@ from src.extract_search import extract_listing_urls
 load_dotenv()
 FIRECRAWL_API_KEY = os.getenv("FIRECRAWL_API_KEY")
 BATCHES_ROOT = PROJECT_ROOT / "data" / "batches"
+CRAWL_METHOD = CFG.get("crawl_method", "firecrawl_v1")
+# tables with more rows than this are written as <table>.jsonl instead of a .json array
+JSONL_MIN_ROWS = 10_000
 
 def latest_batch_dir() -> Path:
-    candidates = [p for p in BATCHES_ROOT.iterdir() if p.is_dir()]
-    if not candidates:
+    latest = newest_subdir(BATCHES_ROOT)
+    if latest is None:
         raise RuntimeError("No batch folder found. Run batch first.")
-    return max(candidates, key=lambda p: p.stat().st_mtime)
+    return latest
 
 def ensure_batch_id(batch_id: Optional[str]) -> str:
     return batch_id or init_batch()
 
 # ---------------------------------------------------------------------
-# DB-like schemas
+# Output rows (one table each). normalize_detail builds plain dicts with
+# these keys, in this order; values are already cleaned by to_int/to_float.
+#   properties:           property_id, street_address, unit_number, city, state, postal_code,
+#                         latitude, longitude, interior_area_sqft, lot_size_sqft, year_built,
+#                         beds, baths, property_type, property_subtype, condition, features,
+#                         created_at, updated_at
+#   listings:             listing_id, property_id, batch_id, source_id, source_url, crawl_method,
+#                         scraped_timestamp, list_date, days_on_market, description, listing_type,
+#                         status, title, list_price, price_per_sqft
+#   media:                listing_id, media_url, caption, display_order, is_primary, created_at, media_type
+#   agents:               listing_id, agent_name, phone, brokerage, email
+#   price_history:        listing_id, event_date, event_type, price, notes
+#   locations:            location_id, street_address, unit_number, city, state, postal_code,
+#                         latitude, longitude
+#   engagement:           listing_id, views, saves, shares
+#   similar_properties:   listing_id, similar_url
+#   financials:           listing_id, hoa_fee, property_taxes_annual
+#   community_attributes: listing_id, climate_risks, amenities, walk_score
 # ---------------------------------------------------------------------
-class PropertyRow(BaseModel):
-    property_id: str
-    street_address: Optional[str] = None
-    unit_number: Optional[str] = None
-    city: Optional[str] = None
-    state: Optional[str] = None
-    postal_code: Optional[str] = None
-    latitude: Optional[float] = None
-    longitude: Optional[float] = None
-    interior_area_sqft: Optional[int] = None
-    lot_size_sqft: Optional[int] = None
-    year_built: Optional[int] = None
-    beds: Optional[float] = None
-    baths: Optional[float] = None
-    property_type: Optional[str] = None
-    property_subtype: Optional[str] = None
-    condition: Optional[str] = None
-    features: Optional[Dict[str, Any]] = None
-    created_at: Optional[str] = None
-    updated_at: Optional[str] = None
-
-class ListingRow(BaseModel):
-    listing_id: str
-    property_id: str
-    batch_id: str
-    source_id: str
-    source_url: str
-    crawl_method: str
-    scraped_timestamp: str
-    list_date: Optional[str] = None
-    days_on_market: Optional[int] = None
-    description: Optional[str] = None
-    listing_type: Optional[str] = None
-    status: Optional[str] = None
-    title: Optional[str] = None
-    list_price: Optional[int] = None
-    price_per_sqft: Optional[float] = None
-
-class MediaRow(BaseModel):
-    listing_id: str
-    media_url: str
-    caption: Optional[str] = None
-    display_order: int = 0
-    is_primary: bool = False
-    created_at: Optional[str] = None
-    media_type: Optional[str] = "image"
-
-class AgentRow(BaseModel):
-    listing_id: str
-    agent_name: Optional[str] = None
-    phone: Optional[str] = None
-    brokerage: Optional[str] = None
-    email: Optional[str] = None
-
-class PriceHistoryRow(BaseModel):
-    listing_id: str
-    event_date: Optional[str] = None
-    event_type: Optional[str] = None
-    price: Optional[int] = None
-    notes: Optional[str] = None
-
-class LocationRow(BaseModel):
-    location_id: str
-    street_address: Optional[str] = None
-    unit_number: Optional[str] = None
-    city: Optional[str] = None
-    state: Optional[str] = None
-    postal_code: Optional[str] = None
-    latitude: Optional[float] = None
-    longitude: Optional[float] = None
-
-class EngagementRow(BaseModel):
-    listing_id: str
-    views: Optional[int] = None
-    saves: Optional[int] = None
-    shares: Optional[int] = None
-
-class SimilarRow(BaseModel):
-    listing_id: str
-    similar_url: str
-
-class FinancialRow(BaseModel):
-    listing_id: str
-    hoa_fee: Optional[int] = None
-    property_taxes_annual: Optional[int] = None
-
-class CommunityRow(BaseModel):
-    listing_id: str
-    climate_risks: Optional[List[int]] = None
-    amenities: Optional[List[str]] = None
-    walk_score: Optional[int] = None
 
 # ---------------------------------------------------------------------
 # Extracted detail schema (Firecrawl output)
@@ -180,39 +111,36 @@ class ExtractedDetail(BaseModel):
 class ExtractedDetailPage(BaseModel):
     details: ExtractedDetail
 
+# Schema generation is per-call work in pydantic v2; build it once for every extract request.
+EXTRACTED_SCHEMA = ExtractedDetailPage.model_json_schema()
+
 # ---------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------
-def stable_uuid(*parts: str) -> str:
-    return hashlib.sha1("|".join([p for p in parts if p]).encode("utf-8")).hexdigest()
-
-def to_int(x) -> Optional[int]:
+def opt_float(x) -> Optional[float]:
+    # lat/lon come straight from Firecrawl's address dict; keep the sign (unlike to_float)
     if x is None:
         return None
-    s = re.sub(r"[^\d\.]", "", str(x))
-    if not s:
-        return None
     try:
-        return int(float(s))
-    except Exception: 
+        return float(x)
+    except (TypeError, ValueError):
         return None
 
-def to_float(x) -> Optional[float]:
-    if x is None: 
-        return None
-    s = re.sub(r"[^\d\.]", "", str(x))
-    if not s: 
-        return None
-    try: 
-        return float(s)
-    except Exception: 
-        return None
+def stable_uuid(*parts: str) -> str:
+    return id_digest("|".join([p for p in parts if p]))
+
+LOCATION_KEYS = ("street","unit","city","state","postal_code","latitude","longitude")
+# key of an address with no usable fields (falsy values join as "")
+_EMPTY_LOCATION_KEY = "|" * (len(LOCATION_KEYS) - 1)
 
 def make_location_id(addr: Dict[str, Any]) -> str:
-    key = "|".join([str(addr.get(k, "") or "") for k in ("street","unit","city","state","postal_code","latitude","longitude")])
-    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+    vals = [addr.get(k) for k in LOCATION_KEYS] if addr else ()
+    if not any(vals):
+        return id_digest(_EMPTY_LOCATION_KEY)
+    return id_digest("|".join([str(v or "") for v in vals]))
 
 def normalize_detail(d: ExtractedDetail, batch_id: str) -> Dict[str, List[Dict[str, Any]]]:
+    ts = d.scraped_timestamp or now_utc_iso()
     sid = (d.source_id or "").lower().strip() or "unknown"
     ext = (d.external_property_id or "").strip()
     url = d.source_url.strip()
@@ -222,64 +150,75 @@ def normalize_detail(d: ExtractedDetail, batch_id: str) -> Dict[str, List[Dict[s
     list_price_i = to_int(d.list_price)
     sqft_i = to_int(d.interior_area_sqft)
 
-    L = ListingRow(
-        listing_id=listing_id, property_id=property_id, batch_id=batch_id,
-        source_id=sid, source_url=url, crawl_method=CFG.get("crawl_method", "firecrawl_v1"),
-        scraped_timestamp=d.scraped_timestamp or now_utc_iso(),
-        list_date=d.list_date, days_on_market=to_int(d.days_on_market),
-        description=d.description, listing_type=(d.listing_type or "sell"),
-        status=d.status, title=None, list_price=list_price_i,
-        price_per_sqft=(list_price_i/sqft_i) if list_price_i and sqft_i else None
-    ).model_dump()
+    L = {
+        "listing_id": listing_id, "property_id": property_id, "batch_id": batch_id,
+        "source_id": sid, "source_url": url, "crawl_method": CRAWL_METHOD,
+        "scraped_timestamp": ts,
+        "list_date": d.list_date, "days_on_market": to_int(d.days_on_market),
+        "description": d.description, "listing_type": (d.listing_type or "sell"),
+        "status": d.status, "title": None, "list_price": list_price_i,
+        "price_per_sqft": (list_price_i/sqft_i) if list_price_i and sqft_i else None,
+    }
 
     addr = d.address or {}
-    P = PropertyRow(
-        property_id=property_id, street_address=addr.get("street"), unit_number=addr.get("unit"),
-        city=addr.get("city"), state=addr.get("state"), postal_code=addr.get("postal_code"),
-        latitude=addr.get("latitude"), longitude=addr.get("longitude"),
-        interior_area_sqft=sqft_i, lot_size_sqft=to_int(d.lot_size_sqft),
-        year_built=to_int(d.year_built), beds=to_float(d.beds), baths=to_float(d.baths),
-        property_type=d.property_type, property_subtype=d.property_subtype, condition=d.condition,
-        features=(d.features or {}), created_at=d.scraped_timestamp or now_utc_iso(),
-        updated_at=d.scraped_timestamp or now_utc_iso(),
-    ).model_dump()
-
-    media_rows = [MediaRow(listing_id=listing_id, media_url=u, display_order=i, is_primary=(i==0),
-                           created_at=d.scraped_timestamp or now_utc_iso()).model_dump()
+    lat, lon = opt_float(addr.get("latitude")), opt_float(addr.get("longitude"))
+    P = {
+        "property_id": property_id, "street_address": addr.get("street"), "unit_number": addr.get("unit"),
+        "city": addr.get("city"), "state": addr.get("state"), "postal_code": addr.get("postal_code"),
+        "latitude": lat, "longitude": lon,
+        "interior_area_sqft": sqft_i, "lot_size_sqft": to_int(d.lot_size_sqft),
+        "year_built": to_int(d.year_built), "beds": to_float(d.beds), "baths": to_float(d.baths),
+        "property_type": d.property_type, "property_subtype": d.property_subtype, "condition": d.condition,
+        "features": (d.features or {}), "created_at": ts,
+        "updated_at": ts,
+    }
+
+    media_rows = [{"listing_id": listing_id, "media_url": u, "caption": None, "display_order": i,
+                   "is_primary": i == 0, "created_at": ts, "media_type": "image"}
                   for i,u in enumerate((d.images or [])[:50])]
 
-    agent_rows = [AgentRow(listing_id=listing_id, agent_name=ag.name, phone=ag.phone,
-                           brokerage=ag.brokerage, email=ag.email).model_dump()
+    agent_rows = [{"listing_id": listing_id, "agent_name": ag.name, "phone": ag.phone,
+                   "brokerage": ag.brokerage, "email": ag.email}
                   for ag in (d.agents or [])]
 
-    ph_rows = [PriceHistoryRow(listing_id=listing_id, event_date=ev.event_date,
-                               event_type=ev.event_type, price=to_int(ev.price), notes=ev.notes).model_dump()
+    ph_rows = [{"listing_id": listing_id, "event_date": ev.event_date, "event_type": ev.event_type,
+                "price": to_int(ev.price), "notes": ev.notes}
                for ev in (d.price_history or [])]
 
     location_id = make_location_id(addr)
-    loc_row = LocationRow(location_id=location_id, street_address=addr.get("street"),
-                          unit_number=addr.get("unit"), city=addr.get("city"),
-                          state=addr.get("state"), postal_code=addr.get("postal_code"),
-                          latitude=addr.get("latitude"), longitude=addr.get("longitude")).model_dump()
+    loc_row = {"location_id": location_id, "street_address": addr.get("street"),
+               "unit_number": addr.get("unit"), "city": addr.get("city"),
+               "state": addr.get("state"), "postal_code": addr.get("postal_code"),
+               "latitude": lat, "longitude": lon}
 
-    eng_row = EngagementRow(listing_id=listing_id, views=to_int(d.metrics_views),
-                            saves=to_int(d.metrics_saves), shares=to_int(d.metrics_shares)).model_dump()
+    eng_row = {"listing_id": listing_id, "views": to_int(d.metrics_views),
+               "saves": to_int(d.metrics_saves), "shares": to_int(d.metrics_shares)}
 
-    sim_rows = [SimilarRow(listing_id=listing_id, similar_url=su).model_dump()
+    sim_rows = [{"listing_id": listing_id, "similar_url": su}
                 for su in (d.similar_properties or []) if su]
 
-    fin_row = FinancialRow(listing_id=listing_id, hoa_fee=to_int(d.hoa_fee),
-                           property_taxes_annual=to_int(d.property_taxes_annual)).model_dump()
+    fin_row = {"listing_id": listing_id, "hoa_fee": to_int(d.hoa_fee),
+               "property_taxes_annual": to_int(d.property_taxes_annual)}
 
-    comm_row = CommunityRow(listing_id=listing_id, climate_risks=[], amenities=[], walk_score=None).model_dump()
+    comm_row = {"listing_id": listing_id, "climate_risks": [], "amenities": [], "walk_score": None}
 
     return {"listings":[L],"properties":[P],"media":media_rows,"agents":agent_rows,
             "price_history":ph_rows,"locations":[loc_row],"engagement":[eng_row],
             "similar_properties":sim_rows,"financials":[fin_row],"community_attributes":[comm_row]}
 
 def dump_json(path: Path, rows: List[Dict[str, Any]]):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8")
+    write_json_array(path, rows)
+
+def dump_jsonl(path: Path, rows: List[Dict[str, Any]]):
+    write_jsonl(path, rows)
+
+def dump_table(struct_dir: Path, tbl: str, rows: List[Dict[str, Any]]) -> Path:
+    # big tables → JSON Lines; the other format's file from an earlier run is removed so only one copy remains
+    big = len(rows) > JSONL_MIN_ROWS
+    path = struct_dir / f"{tbl}.jsonl" if big else struct_dir / f"{tbl}.json"
+    (dump_jsonl if big else dump_json)(path, rows)
+    (struct_dir / (f"{tbl}.json" if big else f"{tbl}.jsonl")).unlink(missing_ok=True)
+    return path
 
 # ---------------------------------------------------------------------
 # Firecrawl extract
@@ -298,29 +237,27 @@ metrics_views, metrics_saves, metrics_shares,
 similar_properties[])
 """.strip()
 
+# constant request arguments, shared by every extract call
+EXTRACT_KWARGS = {"prompt": PROMPT, "schema": EXTRACTED_SCHEMA}
+
+@functools.lru_cache(maxsize=4)
+def firecrawl_client(api_key: str) -> FirecrawlApp:
+    """One client per API key for the whole process (repeated main() runs reuse it)."""
+    return FirecrawlApp(api_key=api_key)
+
 def _to_dict_like(x):
-    if x is None: 
-        return None
+    # plain JSON values (the common case for SDK payloads) return before any attribute probing;
+    # no exception handlers here: callers already treat any error as a failed extract
+    if x is None or isinstance(x,(dict,list,str,int,float,bool)):
+        return x
     md = getattr(x,"model_dump",None)
-    if callable(md):
-        try: 
-            return md()
-        except Exception:
-            pass
-    d = getattr(x,"dict",None)
+    if md is not None:
+        return md()
+    d = getattr(x,"dict",None)   # pydantic v1 models
     if callable(d):
-        try: 
-            return d()
-        except Exception: 
-            pass
-    if hasattr(x,"__dict__"):
-        try:
-            return dict(x.__dict__)
-        except Exception: 
-            pass
-    if isinstance(x,(dict,list,str,int,float,bool)):
-        return x
-    return None
+        return d()
+    d = getattr(x,"__dict__",None)
+    return dict(d) if d is not None else None
 
 def _unwrap_details(result) -> Optional[dict]:
     if result is None: 
@@ -341,7 +278,7 @@ def _unwrap_details(result) -> Optional[dict]:
 
 def extract_one(fc: FirecrawlApp,url:str)->Optional[ExtractedDetail]:
     try:
-        r=fc.extract([url],prompt=PROMPT,schema=ExtractedDetailPage.model_json_schema())
+        r=fc.extract([url],**EXTRACT_KWARGS)
         d=_unwrap_details(r)
         if d:
             return ExtractedDetail.model_validate(d)
@@ -369,14 +306,14 @@ def load_or_prepare_urls(batch_id:str,limit:int,seed_limit:int=4)->List[str]:
     struct_dir=BATCHES_ROOT/batch_id/"structured"
     urls_path=struct_dir/"listing_urls.json"
     if urls_path.exists():
-        payload=json.loads(urls_path.read_text(encoding="utf-8"))
+        payload=json_loads(urls_path.read_bytes())
         url_rows=payload.get("urls") or []
         urls=[r["source_url"] if isinstance(r,dict) else str(r) for r in url_rows]
         return urls[:limit]
     fetch_search_pages(batch_id=batch_id,limit=seed_limit)
     extract_listing_urls(batch_id=batch_id,max_search_files=seed_limit)
     if urls_path.exists():
-        payload=json.loads(urls_path.read_text(encoding="utf-8"))
+        payload=json_loads(urls_path.read_bytes())
         url_rows=payload.get("urls") or []
         urls=[r["source_url"] if isinstance(r,dict) else str(r) for r in url_rows]
         return urls[:limit]
@@ -385,10 +322,69 @@ def load_or_prepare_urls(batch_id:str,limit:int,seed_limit:int=4)->List[str]:
 # ---------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------
-def main(batch_id: Optional[str]=None,limit:int=10,delay_sec:float=1.0,seed_limit:int=4,new_batch:bool=False):
+class RequestSpacer:
+    """Shared pacing for all workers: request starts are at least `interval` seconds apart.
+    Workers wait for their start slot before the call instead of sleeping after it."""
+    def __init__(self, interval: float):
+        self.interval = max(0.0, interval)
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+# extracted details persist across batches: a URL that was already extracted costs no API call
+EXTRACT_CACHE_DIR = PROJECT_ROOT / "data" / ".cache" / "firecrawl_extract"
+# bump when PROMPT / the schema change so stale entries are ignored
+EXTRACT_CACHE_VERSION = 1
+# price / status go stale: entries older than this (file mtime) are extracted again
+EXTRACT_CACHE_MAX_AGE_HOURS = float(CFG["run"].get("extract_cache_max_age_hours", 24))
+
+def _extract_cache_path(url: str) -> Path:
+    key = hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+    return EXTRACT_CACHE_DIR / f"v{EXTRACT_CACHE_VERSION}_{key}.json"
+
+def _extract_cache_fresh(path: Path, max_age_hours: float) -> bool:
+    try:
+        age = time.time() - path.stat().st_mtime
+    except OSError:
+        return False
+    return age <= max_age_hours * 3600
+
+def _extract_paced(fc: FirecrawlApp,url:str,spacer:RequestSpacer,use_cache:bool=True,
+                   max_age_hours:float=EXTRACT_CACHE_MAX_AGE_HOURS)->Optional[ExtractedDetail]:
+    cache_path = _extract_cache_path(url) if use_cache else None
+    if cache_path is not None and _extract_cache_fresh(cache_path, max_age_hours):
+        cached = read_json(cache_path)
+        if isinstance(cached, dict):
+            try:
+                return ExtractedDetail.model_validate(cached)
+            except Exception:
+                pass  # unreadable entry → extract again and overwrite it
+    spacer.wait()
+    det = extract_one(fc,url)
+    if det is None:
+        return None
+    # stamped before caching, so a later hit keeps the real extraction time
+    det.source_url=det.source_url or url
+    det.scraped_timestamp=det.scraped_timestamp or now_utc_iso()
+    if cache_path is not None:
+        try:
+            write_json(cache_path, det.model_dump())
+        except OSError as e:   # the cache is best-effort; never lose the extraction over it
+            print(f"   → extract cache write failed: {e}")
+    return det
+
+def main(batch_id: Optional[str]=None,limit:int=10,delay_sec:float=1.0,seed_limit:int=4,new_batch:bool=False,workers:int=5,use_cache:bool=True,
+         cache_max_age_hours:float=EXTRACT_CACHE_MAX_AGE_HOURS):
     if not FIRECRAWL_API_KEY:
         raise RuntimeError("Set FIRECRAWL_API_KEY in .env")
-    fc=FirecrawlApp(api_key=FIRECRAWL_API_KEY)
+    fc=firecrawl_client(FIRECRAWL_API_KEY)
     if new_batch or not batch_id:
         batch_id=ensure_batch_id(batch_id)
     batch_dir=BATCHES_ROOT/batch_id
@@ -399,21 +395,23 @@ def main(batch_id: Optional[str]=None,limit:int=10,delay_sec:float=1.0,seed_limi
         raise RuntimeError("No URLs to extract")
     print(f"Batch: {batch_id} | URLs: {len(urls)}")
     buckets:Dict[str,List[Dict[str,Any]]]=defaultdict(list)
-    for i,url in enumerate(urls,1):
-        print(f"[{i}/{len(urls)}] {url}")
-        det=extract_one(fc,url)
-        if not det:
-            print("   → no details extracted")
-            time.sleep(delay_sec)
-            continue
-        det.source_url=det.source_url or url
-        det.scraped_timestamp=det.scraped_timestamp or now_utc_iso()
-        rows=normalize_detail(det,batch_id=batch_id)
-        for k,v in rows.items():
-            buckets[k].extend(v)
-        time.sleep(delay_sec)
+    # up to `workers` extractions in flight; starts are spaced delay_sec apart across all of them
+    spacer=RequestSpacer(delay_sec)
+    with ThreadPoolExecutor(max_workers=max(1,workers)) as ex:
+        futs=[ex.submit(_extract_paced,fc,url,spacer,use_cache,cache_max_age_hours) for url in urls]
+        for i,(url,fut) in enumerate(zip(urls,futs),1):
+            det=fut.result()
+            print(f"[{i}/{len(urls)}] {url}")
+            if not det:
+                print("   → no details extracted")
+                continue
+            det.source_url=det.source_url or url
+            det.scraped_timestamp=det.scraped_timestamp or now_utc_iso()
+            rows=normalize_detail(det,batch_id=batch_id)
+            for k,v in rows.items():
+                buckets[k].extend(v)
     for tbl,arr in buckets.items():
-        dump_json(struct_dir/f"{tbl}.json",arr)
+        dump_table(struct_dir,tbl,arr)
     print(f"✅ Wrote JSON files to {struct_dir}")
     for tbl,arr in buckets.items():
         print(f"   {tbl}={len(arr)}")
@@ -429,5 +427,10 @@ if __name__=="__main__":
     ap.add_argument("--delay",type=float,default=1.0)
     ap.add_argument("--seed-limit",type=int,default=4)
     ap.add_argument("--new-batch",action="store_true")
+    ap.add_argument("--workers",type=int,default=5)
+    ap.add_argument("--no-cache",action="store_true",help="ignore and don't write the per-URL extract cache")
+    ap.add_argument("--cache-max-age-hours",type=float,default=EXTRACT_CACHE_MAX_AGE_HOURS,
+                    help="re-extract URLs whose cache entry is older than this (default: run.extract_cache_max_age_hours or 24)")
     args=ap.parse_args()
-    main(batch_id=args.batch_id,limit=args.limit,delay_sec=args.delay,seed_limit=args.seed_limit,new_batch=args.new_batch)
+    main(batch_id=args.batch_id,limit=args.limit,delay_sec=args.delay,seed_limit=args.seed_limit,new_batch=args.new_batch,workers=args.workers,use_cache=not args.no_cache,
+         cache_max_age_hours=args.cache_max_age_hours)
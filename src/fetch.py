@@ -2,15 +2,32 @@
 # Purpose: Fetch search/detail pages and persist raw HTML + minimal metadata to the batch folders.
 from __future__ import annotations
 import os
-import json
+import asyncio
 import random
 import time
+import functools
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
 from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 from urllib.parse import urlparse
 from dotenv import load_dotenv
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+try:
+    import httpx
+    import h2  # noqa: F401  (httpx's HTTP/2 support: pip install "httpx[http2]")
+except ImportError:
+    httpx = None
 from src.settings import (
     CFG,
     PROJECT_ROOT,
@@ -19,18 +36,63 @@ from src.settings import (
     default_headers,
     make_batch_dirs,
     now_utc_iso,
-    latest_batch_dir
+    latest_batch_dir,
+    json_loads,
+    json_dumps_bytes,
 )
 
 load_dotenv()
 FIRECRAWL_API = "https://api.firecrawl.dev"
 FIRECRAWL_KEY = os.getenv("FIRECRAWL_API_KEY")
 
-UA_POOL = [
+UA_POOL = (
     CFG["run"]["user_agent"],
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 13_4_1) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.5 Safari/605.1.15",
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36",
-]
+)
+
+@functools.lru_cache(maxsize=1)
+def _session() -> requests.Session:
+    """Shared keep-alive session (pooled connections + transport-level retries on connect errors)."""
+    s = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        # connection-level retries only; 429/5xx are retried by fetch_and_save (Retry-After aware)
+        max_retries=Retry(total=3, backoff_factor=0.3, raise_on_status=False),
+    )
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.stream = False
+    # gzip/deflate (+ br/zstd لو المكتبات متوفرة) — فك الضغط يتم في urllib3
+    s.headers["Accept-Encoding"] = make_headers(accept_encoding=True)["accept-encoding"]
+    return s
+
+# HTTP/2 لو httpx[http2] متوفر: كل الـ worker threads تتشارك اتصال TLS واحد لكل host
+# (multiplexing) بدل اتصال لكل طلب. "run.http2": false يرجّع requests/HTTP/1.1.
+USE_HTTP2: bool = httpx is not None and bool(CFG["run"].get("http2", True))
+
+@functools.lru_cache(maxsize=1)
+def _http2_client():
+    """Shared thread-safe HTTP/2 client; retries stay in fetch_and_save's own loop."""
+    return httpx.Client(
+        http2=True,
+        timeout=REQUEST_TIMEOUT_SEC,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+    )
+
+STREAM_CHUNK = 1 << 16
+
+@contextmanager
+def _streamed_get(url: str, headers: Dict[str, str], timeout: int):
+    """Direct GET with the body still unread: yields (response, iterator of 64 KiB body chunks)."""
+    if USE_HTTP2:
+        with _http2_client().stream("GET", url, headers=headers, timeout=timeout) as r:
+            yield r, r.iter_bytes(STREAM_CHUNK)
+    else:
+        with _session().get(url, headers=headers, timeout=timeout, allow_redirects=True, stream=True) as r:
+            yield r, r.iter_content(STREAM_CHUNK)
 
 def redfin_headers() -> Dict[str, str]:
     ua = random.choice(UA_POOL)
@@ -44,20 +106,32 @@ def redfin_headers() -> Dict[str, str]:
     base["Referer"] = "https://www.redfin.com/"
     return base
 
+# built once; shared read-only by every request (requests/httpx/aiohttp copy headers, never mutate them)
+_DEFAULT_HEADERS = default_headers()
+
+def _redfin_template() -> Dict[str, str]:
+    h = redfin_headers()
+    # دمج أي هيدر افتراضي عندك
+    for k, v in _DEFAULT_HEADERS.items():
+        h.setdefault(k, v)
+    del h["User-Agent"]
+    return h
+
+# Redfin headers minus the rotating User-Agent, merged once at import
+_REDFIN_TEMPLATE = _redfin_template()
+
 def choose_headers_for(url: str) -> Dict[str, str]:
-    if "redfin.com" in url:
-        h = redfin_headers()
-        # دمج أي هيدر افتراضي عندك
-        h.update({k:v for k,v in default_headers().items() if k not in h})
-        return h
-    return default_headers()
+    if _infer_source_id(url) == "redfin":
+        # fresh dict per request: only the UA changes
+        return {"User-Agent": random.choice(UA_POOL), **_REDFIN_TEMPLATE}
+    return _DEFAULT_HEADERS
 
 def fetch_via_firecrawl(url: str, timeout: int) -> Optional[str]:
     """fetch HTML via Firecrawl API if API key is set and crawl_method is 'firecrawl_v1'."""
     if not FIRECRAWL_KEY or CFG.get("crawl_method") != "firecrawl_v1":
         return None
     try:
-        r = requests.post(
+        r = _session().post(
             f"{FIRECRAWL_API}/v1/scrape",
             headers={"Authorization": f"Bearer {FIRECRAWL_KEY}", "Content-Type": "application/json"},
             json={"url": url, "formats": ["html"]},
@@ -99,17 +173,14 @@ def _detect_source_id(row: Dict[str, str]) -> str:
     p = (row.get("source_id") or "").lower()
     if p in ("zillow", "redfin"):
         return p
-    u = row.get("url", "")
-    if "zillow.com" in u:
-        return "zillow"
-    if "redfin.com" in u:
-        return "redfin"
-    return "unknown"
+    return _infer_source_id(row.get("url", ""))
 
 def _balanced_mix(rows: List[Dict[str, str]], limit: int) -> List[Dict[str, str]]:
-    z = [r for r in rows if _detect_source_id(r) == "zillow"]
-    r = [r for r in rows if _detect_source_id(r) == "redfin"]
-    o = [r for r in rows if _detect_source_id(r) == "unknown"]
+    # one pass: each row is classified once
+    groups: Dict[str, List[Dict[str, str]]] = {"zillow": [], "redfin": [], "unknown": []}
+    for row in rows:
+        groups[_detect_source_id(row)].append(row)
+    z, r, o = groups["zillow"], groups["redfin"], groups["unknown"]
 
     random.shuffle(z)
     random.shuffle(r)
@@ -148,84 +219,284 @@ class FetchResult:
 
 # ============================ core fetching ============================
 
+# registered domain (last two host labels) → source_id; www. / m. / any subdomain maps the same
+_SOURCE_BY_DOMAIN = {"zillow.com": "zillow", "redfin.com": "redfin"}
+
 def _infer_source_id(url: str) -> str:
     host = urlparse(url).hostname or ""
-    if "zillow.com" in host:
-        return "zillow"
-    if "redfin.com" in host:
-        return "redfin"
-    return "unknown"
+    return _SOURCE_BY_DOMAIN.get(".".join(host.rsplit(".", 2)[-2:]), "unknown")
 
 def _should_retry(status: int) -> bool:
     return status in (429,) or (500 <= status <= 599)
 
+# transient network failures are worth a retry; anything else (bad URL / schema, disk errors, ...)
+# would fail the same way again, so it is raised on the first attempt
+_RETRYABLE_ERRORS: tuple = (
+    ConnectionError, TimeoutError,
+    requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+)
+if httpx is not None:
+    _RETRYABLE_ERRORS += (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+if aiohttp is not None:
+    _RETRYABLE_ERRORS += (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
+
+# ---------- conditional GET (ETag / Last-Modified) ----------
+# كل meta يحفظ ETag / Last-Modified؛ الـ batch اللي بعده يرسلهم كـ If-None-Match / If-Modified-Since،
+# ولو الرد 304 ننسخ الـ HTML القديم بدل ما ننزله من جديد. "run.conditional_get": false يوقفها.
+CONDITIONAL_GET: bool = bool(CFG["run"].get("conditional_get", True))
+_prior_guard = threading.Lock()
+
+def _header(headers: Dict[str, str], name: str) -> Optional[str]:
+    """Case-insensitive lookup (saved headers keep whatever case the server / client used)."""
+    name = name.lower()
+    for k, v in headers.items():
+        if k.lower() == name:
+            return v
+    return None
+
+@functools.lru_cache(maxsize=8)
+def _prior_pages(raw_dir: Path) -> Dict[str, Dict[str, str]]:
+    """requested_url → {etag, last_modified, html_file} from the newest other batch's raw/ metas."""
+    current = raw_dir.parent.name
+    prev, prev_mtime = None, None
+    with os.scandir(_batches_root()) as it:
+        for e in it:
+            if e.name == current or not e.is_dir():
+                continue
+            mtime = e.stat().st_mtime
+            if prev_mtime is None or mtime > prev_mtime:
+                prev, prev_mtime = Path(e.path) / "raw", mtime
+    out: Dict[str, Dict[str, str]] = {}
+    if prev is None or not prev.is_dir():
+        return out
+    for mp in prev.glob("*_meta.json"):
+        try:
+            m = json_loads(mp.read_bytes())
+        except Exception:
+            continue
+        if not (m.get("etag") or m.get("last_modified")):
+            continue
+        html_path = mp.with_name(mp.name.replace("_meta.json", "_raw.html"))
+        if html_path.exists():
+            out[m.get("requested_url")] = {
+                "etag": m.get("etag"),
+                "last_modified": m.get("last_modified"),
+                "html_file": str(html_path),
+            }
+    return out
+
+def _prior_page(raw_dir: Path, url: str) -> Optional[Dict[str, str]]:
+    if not CONDITIONAL_GET:
+        return None
+    with _prior_guard:   # one index build per batch even when all workers start at once
+        return _prior_pages(raw_dir).get(url)
+
+def _conditional_headers(headers: Dict[str, str], prior: Optional[Dict[str, str]]) -> Dict[str, str]:
+    if not prior:
+        return headers
+    h = dict(headers)   # the defaults dict is shared; never mutate it
+    if prior["etag"]:
+        h["If-None-Match"] = prior["etag"]
+    if prior["last_modified"]:
+        h["If-Modified-Since"] = prior["last_modified"]
+    return h
+
+# ---------- per-host rate limit ----------
+class TokenBucket:
+    """rate requests/sec with bursts up to `burst`; reserve() hands out the wait for the next slot."""
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        # tokens may go negative: each caller books its own future slot, so waits don't pile up
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self) -> None:
+        time.sleep(self.reserve())
+
+PER_HOST_CONCURRENCY = 2
+
+# default = PER_HOST_CONCURRENCY requests per average sleep_range_sec, the pace the old
+# "sleep after every request" gave each host; hosts no longer wait on each other
+HOST_RATE_PER_SEC: float = float(CFG["run"].get("host_rate_per_sec", PER_HOST_CONCURRENCY / (sum(SLEEP_RANGE_SEC) / 2)))
+HOST_BURST: float = float(CFG["run"].get("host_burst", 3))
+_host_buckets: Dict[str, TokenBucket] = {}
+_host_buckets_guard = threading.Lock()
+
+def _host_bucket(url: str) -> TokenBucket:
+    host = urlparse(url).netloc
+    with _host_buckets_guard:
+        b = _host_buckets.get(host)
+        if b is None:
+            b = _host_buckets[host] = TokenBucket(HOST_RATE_PER_SEC, HOST_BURST)
+        return b
+
+# ---------- retry backoff ----------
+RETRY_BASE_SEC = 1.0
+RETRY_CAP_SEC = 30.0
+RETRY_AFTER_MAX_SEC = 300.0   # a Retry-After beyond this would park a worker for too long
+
+def _retry_after(headers: Dict[str, str]) -> Optional[float]:
+    """Retry-After in seconds (delta-seconds or HTTP-date form), or None."""
+    ra = (_header(headers, "Retry-After") or "").strip()
+    if not ra:
+        return None
+    if ra.isdigit():
+        return float(ra)
+    try:
+        when = parsedate_to_datetime(ra)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+def _backoff(prev: float, retry_after: Optional[float] = None) -> float:
+    """The server's Retry-After when it sent one, else decorrelated jitter: uniform(base, prev*3), capped."""
+    if retry_after is not None:
+        return min(retry_after, RETRY_AFTER_MAX_SEC)
+    return min(RETRY_CAP_SEC, random.uniform(RETRY_BASE_SEC, max(RETRY_BASE_SEC, prev) * 3))
+
+def _reuse_prior(prior: Dict[str, str], resp_headers: Dict[str, str]) -> bytes:
+    """304 Not Modified: the previous batch's HTML stands in for the body; validators carry forward."""
+    if not _header(resp_headers, "ETag") and prior["etag"]:
+        resp_headers["ETag"] = prior["etag"]
+    if not _header(resp_headers, "Last-Modified") and prior["last_modified"]:
+        resp_headers["Last-Modified"] = prior["last_modified"]
+    return Path(prior["html_file"]).read_bytes()
+
+def _html_path(raw_dir: Path, idx: int) -> Path:
+    return raw_dir / f"{idx:04d}_raw.html"
+
+def _stream_to(path: Path, chunks) -> None:
+    """Write chunks to path via a .part file, so a dropped connection never leaves a truncated page."""
+    part = path.with_name(path.name + ".part")
+    try:
+        with part.open("wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(part, path)
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+
+def _write_fetched(html_path: Path, html_text: Union[str, bytes, None], resp_path: Path, resp: Dict,
+                   meta_path: Path, meta: Dict) -> None:
+    # direct fetches hand over the response bytes as received (no decode/encode round trip);
+    # Firecrawl returns text → encode as utf-8 (ignore errors) and write it in binary mode too,
+    # so no platform newline translation happens on either path.
+    # raw_dir is created once by the entry point (make_batch_dirs), not per page.
+    # None: the body was already streamed to html_path.
+    if html_text is not None:
+        if not isinstance(html_text, bytes):
+            html_text = html_text.encode("utf-8", "ignore")
+        html_path.write_bytes(html_text)
+    resp_path.write_bytes(json_dumps_bytes(resp))
+    meta_path.write_bytes(json_dumps_bytes(meta))
+
+def _save_fetched(
+    idx: int,
+    url: str,
+    raw_dir: Path,
+    html_text: Union[str, bytes, None],
+    status: int,
+    final_url: str,
+    resp_headers: Dict[str, str],
+    seed_kind: str,
+    batch_id: Optional[str],
+) -> FetchResult:
+    """html_text=None: the body is already on disk (streamed by fetch_and_save)."""
+    html_path = _html_path(raw_dir, idx)
+    meta_path = raw_dir / f"{idx:04d}_meta.json"
+    resp_path = raw_dir / f"{idx:04d}_response.json"
+
+    resp = {
+        "status": status or (200 if html_text else 0),
+        "final_url": final_url,
+        "headers": resp_headers,
+    }
+
+    source_id = _infer_source_id(final_url or url)
+    meta = {
+        "batch_id": batch_id,
+        "requested_url": url,
+        "final_url": final_url,
+        "status": resp["status"],
+        "scraped_timestamp": now_utc_iso(),
+        "source_id": source_id,
+        "crawl_method": CFG.get("crawl_method", "requests"),
+        "seed_kind": seed_kind,
+        "idx": idx,
+        "etag": _header(resp_headers, "ETag"),
+        "last_modified": _header(resp_headers, "Last-Modified"),
+    }
+
+    _write_fetched(html_path, html_text, resp_path, resp, meta_path, meta)
+    return FetchResult(resp["status"], final_url, str(html_path), str(meta_path), str(resp_path))
+
 def fetch_and_save(
     idx: int,
     url: str,
     raw_dir: Path,
     headers: Optional[Dict[str, str]] = None,
     timeout: int = REQUEST_TIMEOUT_SEC,
-    max_retries: int = 2,
+    max_retries: int = 4,
     seed_kind: str = "search_or_detail",
     batch_id: Optional[str] = None,
 ) -> FetchResult:
-    raw_dir.mkdir(parents=True, exist_ok=True)
-
+    """raw_dir must already exist (the entry points get it from make_batch_dirs)."""
     headers = headers or choose_headers_for(url)
+    prior = _prior_page(raw_dir, url)
 
     attempt = 0
+    backoff = 0.0
     last_exc: Optional[Exception] = None
     while attempt <= max_retries:
+        _host_bucket(url).acquire()
         html_text = None
         final_url = url
         status = 0
+        resp_headers: Dict[str, str] = {}
+        retry_after: Optional[float] = None
         try:
             #try Firecrawl if configured
             html_text = fetch_via_firecrawl(url, timeout=timeout)
 
-            # fallback to requests if Firecrawl not used or failed
+            # fallback to a direct GET (HTTP/2 client or requests) if Firecrawl not used or failed
             if not html_text:
-                r = requests.get(url, headers=headers, timeout=timeout, allow_redirects=True)
-                status = r.status_code
-                final_url = r.url
-                html_text = r.text or ""
-
-            html_path = raw_dir / f"{idx:04d}_raw.html"
-            meta_path = raw_dir / f"{idx:04d}_meta.json"
-            resp_path = raw_dir / f"{idx:04d}_response.json"
-
-            #save HTML with utf-8 and ignore errors
-            html_path.write_text(html_text, encoding="utf-8", errors="ignore")
-
-            resp = {
-                "status": status or (200 if html_text else 0),
-                "final_url": final_url,
-                "headers": dict(r.headers) if 'r' in locals() else {},
-            }
-            resp_path.write_text(json.dumps(resp, indent=2), encoding="utf-8")
-
-            source_id = _infer_source_id(final_url or url)
-            meta = {
-                "batch_id": batch_id,
-                "requested_url": url,
-                "final_url": final_url,
-                "status": resp["status"],
-                "scraped_timestamp": now_utc_iso(),
-                "source_id": source_id,
-                "crawl_method": CFG.get("crawl_method", "requests"),
-                "seed_kind": seed_kind,
-                "idx": idx,
-            }
-            meta_path.write_text(json.dumps(meta, indent=2, ensure_ascii=False), encoding="utf-8")
-
-            return FetchResult(resp["status"], final_url, str(html_path), str(meta_path), str(resp_path))
-
-        except Exception as e:
+                req_headers = _conditional_headers(headers, prior)
+                with _streamed_get(url, req_headers, timeout) as (r, chunks):
+                    status = r.status_code
+                    final_url = str(r.url)
+                    resp_headers = dict(r.headers)
+                    if status == 304 and prior:
+                        html_text = _reuse_prior(prior, resp_headers)
+                    elif not (_should_retry(status) and attempt < max_retries):
+                        # the body goes to disk chunk by chunk, never held whole in memory
+                        _stream_to(_html_path(raw_dir, idx), chunks)
+
+            # 429 / 5xx with retries left → back off and try again; the last attempt is saved as is
+            if _should_retry(status) and attempt < max_retries:
+                retry_after = _retry_after(resp_headers)
+            else:
+                return _save_fetched(
+                    idx, url, raw_dir, html_text, status, final_url,
+                    resp_headers, seed_kind, batch_id,
+                )
+
+        except _RETRYABLE_ERRORS as e:
             last_exc = e
             status = 0
 
         if attempt < max_retries and (status == 0 or _should_retry(status)):
-            backoff = 1.5 ** attempt + random.uniform(0.0, 0.5)
+            backoff = _backoff(backoff, retry_after)
             time.sleep(backoff)
             headers = choose_headers_for(url)
             attempt += 1
@@ -236,9 +507,132 @@ def fetch_and_save(
         raise last_exc
     raise RuntimeError(f"Failed to fetch {url}")
 
-def polite_sleep():
-    lo, hi = SLEEP_RANGE_SEC
-    time.sleep(random.uniform(lo, hi))
+_host_locks: Dict[str, threading.Semaphore] = {}
+_host_locks_guard = threading.Lock()
+
+def _host_slot(url: str) -> threading.Semaphore:
+    host = urlparse(url).netloc
+    with _host_locks_guard:
+        sem = _host_locks.get(host)
+        if sem is None:
+            sem = _host_locks[host] = threading.Semaphore(PER_HOST_CONCURRENCY)
+        return sem
+
+def _polite_fetch(idx: int, url: str, raw_dir: Path, seed_kind: str, batch_id: Optional[str]) -> FetchResult:
+    # حد أقصى لكل host؛ معدل الطلبات لكل host يضبطه _host_bucket داخل fetch_and_save
+    with _host_slot(url):
+        return fetch_and_save(idx, url, raw_dir, seed_kind=seed_kind, batch_id=batch_id)
+
+def _fetch_many(jobs: List[tuple], raw_dir: Path, seed_kind: str, batch_id: Optional[str], workers: int) -> List[FetchResult]:
+    """jobs = [(idx, url, label)] → results in input order (failures are printed and skipped)."""
+    out: List[Optional[FetchResult]] = [None] * len(jobs)
+    # no more threads than jobs (a 3-seed run needs 3, not 8)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as ex:
+        futs = {
+            ex.submit(_polite_fetch, idx, url, raw_dir, seed_kind, batch_id): (pos, url, label)
+            for pos, (idx, url, label) in enumerate(jobs)
+        }
+        for fut in as_completed(futs):
+            pos, url, label = futs[fut]
+            try:
+                res = fut.result()
+                out[pos] = res
+                print(f"[{label}] {res.status} -> {url}")
+            except Exception as e:
+                print(f"[{label}] ERROR {type(e).__name__}: {e}")
+    return [r for r in out if r is not None]
+
+# ============================ async fetching (aiohttp) ============================
+
+async def _fetch_and_save_async(
+    session,
+    host_slots: Dict[str, asyncio.Semaphore],
+    idx: int,
+    url: str,
+    raw_dir: Path,
+    seed_kind: str,
+    batch_id: Optional[str],
+    max_retries: int = 4,
+) -> FetchResult:
+    sem = host_slots.setdefault(urlparse(url).netloc, asyncio.Semaphore(PER_HOST_CONCURRENCY))
+    headers = choose_headers_for(url)
+    prior = await asyncio.to_thread(_prior_page, raw_dir, url)
+    last_exc: Optional[Exception] = None
+    backoff = 0.0
+    async with sem:
+        for attempt in range(max_retries + 1):
+            await asyncio.sleep(_host_bucket(url).reserve())
+            retry_after: Optional[float] = None
+            try:
+                html_text = None
+                if FIRECRAWL_KEY and CFG.get("crawl_method") == "firecrawl_v1":
+                    html_text = await asyncio.to_thread(fetch_via_firecrawl, url, REQUEST_TIMEOUT_SEC)
+                if html_text:
+                    status, final_url, resp_headers = 0, url, {}
+                else:
+                    req_headers = _conditional_headers(headers, prior)
+                    async with session.get(url, headers=req_headers, allow_redirects=True) as r:
+                        status, final_url, resp_headers = r.status, str(r.url), dict(r.headers)
+                        html_text = await r.read()
+                    if status == 304 and prior:
+                        html_text = await asyncio.to_thread(_reuse_prior, prior, resp_headers)
+                if _should_retry(status) and attempt < max_retries:
+                    retry_after = _retry_after(resp_headers)
+                else:
+                    return await asyncio.to_thread(
+                        _save_fetched, idx, url, raw_dir, html_text, status, final_url,
+                        resp_headers, seed_kind, batch_id,
+                    )
+            except _RETRYABLE_ERRORS as e:
+                last_exc = e
+            if attempt < max_retries:
+                backoff = _backoff(backoff, retry_after)
+                await asyncio.sleep(backoff)
+                headers = choose_headers_for(url)
+    raise last_exc or RuntimeError(f"Failed to fetch {url}")
+
+async def _fetch_many_async(
+    jobs: List[tuple],
+    raw_dir: Path,
+    seed_kind: str,
+    batch_id: Optional[str],
+    concurrency: int = 16,
+) -> List[FetchResult]:
+    """Async twin of _fetch_many: one aiohttp session, per-host semaphores, same jobs/output."""
+    if aiohttp is None:
+        raise RuntimeError("aiohttp is not installed (pip install aiohttp)")
+
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=4, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SEC)
+    host_slots: Dict[str, asyncio.Semaphore] = {}
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        outcomes = await asyncio.gather(
+            *(
+                _fetch_and_save_async(session, host_slots, idx, url, raw_dir, seed_kind, batch_id)
+                for idx, url, _ in jobs
+            ),
+            return_exceptions=True,
+        )
+
+    results: List[FetchResult] = []
+    for (_, url, label), res in zip(jobs, outcomes):
+        if isinstance(res, BaseException):
+            print(f"[{label}] ERROR {type(res).__name__}: {res}")
+        else:
+            results.append(res)
+            print(f"[{label}] {res.status} -> {url}")
+    return results
+
+async def fetch_detail_pages_async(
+    urls: List[str],
+    batch_id: Optional[str] = None,
+    start_idx: int = 1001,
+    concurrency: int = 16,
+) -> List[FetchResult]:
+    """Single-threaded variant of fetch_detail_pages."""
+    raw_dir = _resolve_dirs(batch_id)["raw"]
+    jobs = [(start_idx + i, url, str(i + 1)) for i, url in enumerate(urls)]
+    return await _fetch_many_async(jobs, raw_dir, "detail", batch_id, concurrency)
 
 # ============================ public entrypoints ============================
 
@@ -250,7 +644,7 @@ def fetch_first_search_page(batch_id: Optional[str] = None) -> FetchResult:
     if not seeds.exists():
         raise FileNotFoundError(f"Seeds file not found at {seeds}. Run src/batch.py first.")
 
-    payload = json.loads(seeds.read_text(encoding="utf-8"))
+    payload = json_loads(seeds.read_bytes())
     search_pages: List[Dict[str, str]] = payload.get("search_pages", [])
     if not search_pages:
         raise RuntimeError("No search pages in seeds. Check your config areas/zips.")
@@ -261,7 +655,7 @@ def fetch_first_search_page(batch_id: Optional[str] = None) -> FetchResult:
     res = fetch_and_save(1, url, raw_dir, seed_kind="search", batch_id=payload.get("batch_id"))
     return res
 
-def fetch_search_pages(batch_id: Optional[str] = None, limit: int = 999999) -> List[FetchResult]:
+def fetch_search_pages(batch_id: Optional[str] = None, limit: int = 999999, workers: int = 8, use_async: bool = False) -> List[FetchResult]:
     dirs = _resolve_dirs(batch_id)
     struct_dir, raw_dir = dirs["structured"], dirs["raw"]
 
@@ -269,7 +663,7 @@ def fetch_search_pages(batch_id: Optional[str] = None, limit: int = 999999) -> L
     if not seeds.exists():
         raise FileNotFoundError(f"Seeds file not found at {seeds}. Run src/batch.py first.")
 
-    payload = json.loads(seeds.read_text(encoding="utf-8"))
+    payload = json_loads(seeds.read_bytes())
     search_pages: List[Dict[str, str]] = payload.get("search_pages", [])
     if not search_pages:
         raise RuntimeError("No search pages in seeds. Check your config areas/zips.")
@@ -277,33 +671,21 @@ def fetch_search_pages(batch_id: Optional[str] = None, limit: int = 999999) -> L
     # ❗️بدون balanced_mix — نجيب الكل حسب ما جاء بالملف
     rows = search_pages[: min(limit, len(search_pages))]
 
-    results: List[FetchResult] = []
-    for i, row in enumerate(rows, start=1):
-        url = row["url"]
-        try:
-            res = fetch_and_save(i, url, raw_dir, seed_kind="search", batch_id=payload.get("batch_id"))
-            results.append(res)
-            print(f"[{i}/{len(rows)}] {res.status} -> {url}")
-        except Exception as e:
-            print(f"[{i}/{len(rows)}] ERROR {type(e).__name__}: {e}")
-        polite_sleep()
-    return results
+    jobs = [(i, row["url"], f"{i}/{len(rows)}") for i, row in enumerate(rows, start=1)]
+    if use_async:
+        return asyncio.run(_fetch_many_async(jobs, raw_dir, "search", payload.get("batch_id")))
+    return _fetch_many(jobs, raw_dir, "search", payload.get("batch_id"), workers)
+
+def fetch_detail_pages(urls: List[str], batch_id: Optional[str] = None, start_idx: int = 1001, workers: int = 8, use_async: bool = False) -> List[FetchResult]:
+    if use_async:
+        return asyncio.run(fetch_detail_pages_async(urls, batch_id=batch_id, start_idx=start_idx))
 
-def fetch_detail_pages(urls: List[str], batch_id: Optional[str] = None, start_idx: int = 1001) -> List[FetchResult]:
     dirs = _resolve_dirs(batch_id)
     raw_dir = dirs["raw"]
 
-    results: List[FetchResult] = []
-    for i, url in enumerate(urls, start=0):
-        idx = start_idx + i
-        try:
-            res = fetch_and_save(idx, url, raw_dir, seed_kind="detail", batch_id=batch_id)
-            results.append(res)
-            print(f"[{i+1}] {res.status} -> {url}")
-        except Exception as e:
-            print(f"[{i+1}] ERROR {type(e).__name__}: {e}")
-        polite_sleep()
-    return results
+    # الأرقام (1001+i) محجوزة قبل الإرسال عشان أسماء الملفات تبقى ثابتة
+    jobs = [(start_idx + i, url, str(i + 1)) for i, url in enumerate(urls)]
+    return _fetch_many(jobs, raw_dir, "detail", batch_id, workers)
 
 # ============================ CLI ============================
 
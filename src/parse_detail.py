@@ -2,18 +2,32 @@
 # Robust parser for Zillow/Redfin detail pages (new schema, with strong fallbacks)
 
 from __future__ import annotations
+import copy
 import hashlib
-import json
+import logging
 import re
 import html
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
-from src.settings import PROJECT_ROOT, now_utc_iso, to_float, to_int, s_trim, latest_batch_dir
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+from src.settings import PROJECT_ROOT, now_utc_iso, to_float, to_int, s_trim, latest_batch_dir, id_digest, json_loads, read_json, write_json
 
 BATCHES_ROOT = PROJECT_ROOT / "data" / "batches"
-NUM_RE = re.compile(r"[^\d\.]+")
+log = logging.getLogger(__name__)
+ZPID_RE = re.compile(r"/(\d+)_zpid")
+REDFIN_HOME_ID_RE = re.compile(r"/home/(\d+)")
+# canonical detail URLs: source + external id in one match
+DETAIL_URL_RE = re.compile(
+    r"^https?://(?:www\.)?(?:"
+    r"(?P<r>redfin\.com/.*?/home/(?P<rid>\d+))"
+    r"|(?P<z>zillow\.com/.*?/(?P<zid>\d+)_zpid))"
+)
 
 # ---------------- utils ----------------
 
@@ -22,36 +36,70 @@ def guess_source(u: str) -> str:
 
 def ext_id(u: str, sid: str) -> Optional[str]:
     if sid == "zillow":
-        m = re.search(r"/(\d+)_zpid", u)
+        m = ZPID_RE.search(u)
         return m.group(1) if m else None
     if sid == "redfin":
-        m = re.search(r"/home/(\d+)", u)
+        m = REDFIN_HOME_ID_RE.search(u)
         return m.group(1) if m else None
     return None
 
+def source_and_id(u: str) -> Tuple[str, Optional[str]]:
+    m = DETAIL_URL_RE.search(u)
+    if m:
+        return ("redfin", m.group("rid")) if m.group("r") else ("zillow", m.group("zid"))
+    sid = guess_source(u)
+    return sid, ext_id(u, sid)
+
 def stable_id(*parts: str) -> str:
-    return hashlib.sha1("|".join([p or "" for p in parts]).encode("utf-8")).hexdigest()[:32]
+    return id_digest("|".join([p or "" for p in parts]))[:32]
 
 
 def _read_text(p: Path) -> str:
     return p.read_text(encoding="utf-8", errors="ignore")
 
+def _decode_html(raw: bytes) -> str:
+    """Same text as _read_text for the file's bytes (utf-8, errors ignored, universal newlines)."""
+    t = raw.decode("utf-8", "ignore")
+    if "\r" in t:
+        t = t.replace("\r\n", "\n").replace("\r", "\n")
+    return t
+
 def _read_json(p: Path, default=None):
-    if not p.exists(): 
-        return default
-    try:
-        return json.loads(_read_text(p))
-    except Exception: 
-        return default
+    return read_json(p, default)
 
 def _write_json(p: Path, obj):
-    p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
-
-def _blocked(html: str) -> bool:
-    t = (html or "").lower()
-    bad = ("captcha", "access denied", "forbidden", "unusual traffic", "are you a human", "bot detection")
-    return len(t) < 4000 or any(b in t for b in bad)
+    write_json(p, obj)
+
+BLOCK_MARKERS = ("captcha", "access denied", "forbidden", "unusual traffic", "are you a human", "bot detection")
+
+def _build_block_db():
+    db = hyperscan.Database()
+    db.compile(
+        expressions=[m.encode("ascii") for m in BLOCK_MARKERS],
+        ids=list(range(len(BLOCK_MARKERS))),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(BLOCK_MARKERS),
+    )
+    return db
+
+# one caseless multi-literal pass over the page bytes; without hyperscan → lower() + substring checks
+BLOCK_HS_DB = _build_block_db() if hyperscan is not None else None
+
+def _stop_scan(*_args) -> bool:
+    return True  # any marker is enough
+
+def _blocked(html: str, raw: Optional[bytes] = None) -> bool:
+    """raw: the page bytes when the caller has them, so hyperscan scans them without re-encoding."""
+    if not html or len(html) < 4000:
+        return True
+    if BLOCK_HS_DB is None:
+        t = html.lower()
+        return any(b in t for b in BLOCK_MARKERS)
+    try:
+        BLOCK_HS_DB.scan(raw if raw is not None else html.encode("utf-8", "ignore"),
+                         match_event_handler=_stop_scan)
+    except hyperscan.ScanTerminated:
+        return True
+    return False
 
 # ---------------- Zillow extractors ----------------
 def zillow_from_apollo(soup: BeautifulSoup) -> Dict:
@@ -60,11 +108,15 @@ def zillow_from_apollo(soup: BeautifulSoup) -> Dict:
     if not tag or not tag.string:
         return out
     try:
-        data = json.loads(tag.string)
+        data = json_loads(tag.string)
     except Exception:
         return out
 
-    def walk(d):
+    # explicit-stack preorder DFS (children pushed reversed) so the first
+    # match in document order still wins the setdefault() calls below
+    stack = [data]
+    while stack:
+        d = stack.pop()
         if isinstance(d, dict):
             addr = d.get("address")
             if isinstance(addr, dict):
@@ -127,12 +179,9 @@ def zillow_from_apollo(soup: BeautifulSoup) -> Dict:
                             "price": to_int(ev.get("price")),
                             "notes": s_trim(ev.get("description")),
                         })
-            for v in d.values(): 
-                walk(v)
+            stack.extend(reversed(list(d.values())))
         elif isinstance(d, list):
-            for v in d:
-                walk(v)
-    walk(data)
+            stack.extend(reversed(d))
     return out
 
 # ---------------- Redfin extractor ----------------
@@ -142,7 +191,7 @@ def redfin_from_nextdata(soup: BeautifulSoup) -> Dict:
     if not tag or not tag.string:
         return out
     try:
-        data = json.loads(tag.string)
+        data = json_loads(tag.string)
     except Exception:
         return out
 
@@ -167,7 +216,11 @@ def redfin_from_nextdata(soup: BeautifulSoup) -> Dict:
         elif "share" in k: 
             out.setdefault("metrics_shares", ival)
 
-    def walk(d):
+    # explicit-stack preorder DFS (children pushed reversed) so the first
+    # match in document order still wins the setdefault() calls below
+    stack = [data]
+    while stack:
+        d = stack.pop()
         if isinstance(d, dict):
             addr = d.get("address")
             if isinstance(addr, dict):
@@ -200,7 +253,7 @@ def redfin_from_nextdata(soup: BeautifulSoup) -> Dict:
                 if dk in d and not out.get("description"):
                     txt = d.get(dk)
                     if isinstance(txt, str):
-                        out["description"] = s_trim(BeautifulSoup(txt, "html.parser").get_text(" ", strip=True))
+                        out["description"] = s_trim(BeautifulSoup(txt, "lxml").get_text(" ", strip=True))
 
             # الصور
             photos = d.get("photos") or d.get("photoUrls") or d.get("media") or []
@@ -252,28 +305,63 @@ def redfin_from_nextdata(soup: BeautifulSoup) -> Dict:
                             "price": to_int(ev.get("price")),
                             "notes": s_trim(ev.get("description")),
                         })
-            for v in d.values(): walk(v)
+            stack.extend(reversed(list(d.values())))
         elif isinstance(d, list):
-            for v in d: 
-                walk(v)
-    walk(data)
+            stack.extend(reversed(d))
     return out
 
 # ---------------- JSON-LD fallback ----------------
-def from_jsonld(soup: BeautifulSoup) -> Dict:
+LD_JSON_TYPE = "application/ld+json"
+# the same tokens as bytes; every delimiter is ASCII so byte offsets slice cleanly
+_LD_TOKENS_STR = (LD_JSON_TYPE, ('"', "'"), "type=", "<", "<script", ">", "</script>")
+_LD_TOKENS_BYTES = (LD_JSON_TYPE.encode(), (b'"', b"'"), b"type=", b"<", b"<script", b">", b"</script>")
+
+def jsonld_texts(html_text: Union[str, bytes]) -> List[str]:
+    """Bodies of <script type="application/ld+json"> blocks, sliced straight from the HTML (no DOM walk).
+    Accepts the raw page bytes too; then only the sliced bodies get decoded."""
+    is_bytes = isinstance(html_text, (bytes, bytearray))
+    ld, quotes, type_eq, lt_tok, script_tok, gt, close = _LD_TOKENS_BYTES if is_bytes else _LD_TOKENS_STR
+    out: List[str] = []
+    i = html_text.find(ld)
+    while i != -1:
+        q = html_text[i - 1:i]
+        lt = html_text.rfind(lt_tok, 0, i)
+        if (q in quotes and html_text[i - 6:i - 1].lower() == type_eq
+                and html_text[i + len(ld):i + len(ld) + 1] == q
+                and lt != -1 and html_text[lt:lt + 7].lower() == script_tok and gt not in html_text[lt:i]):
+            j = html_text.find(gt, i)
+            k = html_text.find(close, j + 1) if j != -1 else -1
+            if k == -1:
+                break
+            body = html_text[j + 1:k]
+            out.append(_decode_html(body) if is_bytes else body)
+            i = html_text.find(ld, k)
+        else:
+            i = html_text.find(ld, i + 1)
+    return out
+
+def from_jsonld(soup: BeautifulSoup, html_text: Union[str, bytes, None] = None) -> Dict:
     out = {}
     blocks = []
-    for tag in soup.find_all("script", {"type":"application/ld+json"}):
-        txt = tag.string or tag.get_text("", strip=True)
+    # level checked once per page, not per failed blob
+    debug = log.isEnabledFor(logging.DEBUG)
+    if html_text is not None:
+        texts = jsonld_texts(html_text)
+    else:
+        texts = [tag.string or tag.get_text("", strip=True)
+                 for tag in soup.find_all("script", {"type": LD_JSON_TYPE})]
+    for txt in texts:
         if not txt: 
             continue
         try:
-            data = json.loads(txt)
+            data = json_loads(txt)
             if isinstance(data, dict):
                 blocks.append(data)
             elif isinstance(data, list):
                 blocks.extend([x for x in data if isinstance(x, dict)])
-        except Exception:
+        except Exception as e:
+            if debug:
+                log.debug("from_jsonld: failed to parse a blob (%d chars): %s", len(txt), e)
             continue
 
     def prefer(a,b):
@@ -336,6 +424,12 @@ SAVES_RE = re.compile(r'([0-9]{1,3}(?:,[0-9]{3})*)\s+saves?', re.I)
 FAVS_RE  = re.compile(r'([0-9]{1,3}(?:,[0-9]{3})*)\s+(?:favorites?|favorite|favs?)', re.I)
 SHARE_RE = re.compile(r'([0-9]{1,3}(?:,[0-9]{3})*)\s+shares?', re.I)
 PHONE_RE = re.compile(r'(\(?\d{3}\)?[\s\-\.]?\d{3}[\-\.]?\d{4})')
+CITY_STATE_ZIP_RE = re.compile(r",\s*([A-Za-z\.\s]+),\s*([A-Z]{2})\s+(\d{5})")
+GEO_TEXT_RES = (
+    re.compile(r'"latitude"\s*:\s*([-+]?\d+\.\d+).{0,40}"longitude"\s*:\s*([-+]?\d+\.\d+)', re.I|re.S),
+    re.compile(r'"lat"\s*:\s*([-+]?\d+\.\d+).{0,40}"lng"\s*:\s*([-+]?\d+\.\d+)', re.I|re.S),
+)
+PRICE_EVENT_RE = re.compile(r'([A-Z][a-z]{2}\s+\d{1,2},\s+\d{4}).{0,40}\$\s*([0-9]{1,3}(?:,[0-9]{3})+)', re.S)
 
 GENERIC_TITLES = {
     "about this home", "about this house", "facts and features",
@@ -348,8 +442,18 @@ def _text_all(soup: BeautifulSoup) -> str:
 
 def extract_from_meta(soup: BeautifulSoup) -> Dict:
     out = {}
+    # one walk over <meta> tags (first tag per name / property wins), instead of a find() per key
+    by_name: Dict[str, object] = {}
+    by_prop: Dict[str, object] = {}
+    for tag in soup.find_all("meta"):
+        n = tag.get("name")
+        if isinstance(n, str):
+            by_name.setdefault(n, tag)
+        pr = tag.get("property")
+        if isinstance(pr, str):
+            by_prop.setdefault(pr, tag)
     def _get(name):
-        tag = soup.find("meta", attrs={"name": name}) or soup.find("meta", attrs={"property": name})
+        tag = by_name.get(name) or by_prop.get(name)
         if tag and (tag.get("content")):
             return tag["content"].strip()
         return None
@@ -400,7 +504,7 @@ def extract_description_dom(soup: BeautifulSoup) -> Optional[str]:
         return None
     return s_trim(max(candidates, key=len))
 
-def extract_from_dom_common(soup: BeautifulSoup, base_url: str) -> Dict:
+def extract_from_dom_common(soup: BeautifulSoup, base_url: str, text: Optional[str] = None) -> Dict:
     out = {}
     # عنوان صفحة: تجنّب العناوين العامة
     for tag in soup.find_all(["h1","h2"]):
@@ -422,13 +526,13 @@ def extract_from_dom_common(soup: BeautifulSoup, base_url: str) -> Dict:
     if addr_candidates:
         line = addr_candidates[0]
         out.setdefault("street_address", line)
-        m = re.search(r",\s*([A-Za-z\.\s]+),\s*([A-Z]{2})\s+(\d{5})", line)
+        m = CITY_STATE_ZIP_RE.search(line)
         if m:
             out["city"] = m.group(1).strip()
             out["state"] = m.group(2).strip()
             out["postal_code"] = m.group(3).strip()
 
-    big = _text_all(soup)
+    big = _text_all(soup) if text is None else text
 
     m = PRICE_RE.search(big)
     if m:
@@ -451,6 +555,8 @@ def extract_from_dom_common(soup: BeautifulSoup, base_url: str) -> Dict:
 
     # صور من <img>
     imgs = out.get("images", []) or []
+    bp = urlparse(base_url or "")
+    origin = f"{bp.scheme}://{bp.netloc}" if bp.scheme and bp.netloc else None
     for img in soup.find_all("img"):
         u = img.get("data-src") or img.get("src")
         if not u:
@@ -461,7 +567,8 @@ def extract_from_dom_common(soup: BeautifulSoup, base_url: str) -> Dict:
         if u.startswith("//"):
             u = "https:" + u
         if u.startswith("/"): 
-            u = urljoin(base_url, u)
+            # root-relative → prepend origin (urljoin only when dot-segments need resolving)
+            u = origin + u if origin and "/." not in u else urljoin(base_url, u)
         if u.lower().startswith("http"):
             imgs.append(u)
         if len(imgs) >= 30:
@@ -483,10 +590,7 @@ def extract_geo_dom(soup: BeautifulSoup) -> Dict:
             return out
     # سكربتات أو نصوص فيها latitude/longitude أو lat/lng
     raw = soup.get_text(" ", strip=False)
-    for rx in (
-        re.compile(r'"latitude"\s*:\s*([-+]?\d+\.\d+).{0,40}"longitude"\s*:\s*([-+]?\d+\.\d+)', re.I|re.S),
-        re.compile(r'"lat"\s*:\s*([-+]?\d+\.\d+).{0,40}"lng"\s*:\s*([-+]?\d+\.\d+)', re.I|re.S),
-    ):
+    for rx in GEO_TEXT_RES:
         m = rx.search(raw)
         if m:
             out["latitude"] = to_float(m.group(1))
@@ -494,9 +598,9 @@ def extract_geo_dom(soup: BeautifulSoup) -> Dict:
             break
     return out
 
-def extract_engagement_dom(soup: BeautifulSoup) -> Dict:
+def extract_engagement_dom(soup: BeautifulSoup, text: Optional[str] = None) -> Dict:
     out = {}
-    text = _text_all(soup).lower()
+    text = (_text_all(soup) if text is None else text).lower()
     mv = VIEWS_RE.search(text)
     ms = SAVES_RE.search(text) or FAVS_RE.search(text)
     mh = SHARE_RE.search(text)
@@ -528,7 +632,7 @@ def extract_agents_dom(soup: BeautifulSoup) -> List[Dict]:
             brokerage = None
             phone = None
             name = txt.split(" - ")[0].strip() if " - " in txt else txt.split(",")[0].strip()
-            pm = re.search(r'(\(?\d{3}\)?[\s\-\.]?\d{3}[\-\.]?\d{4})', txt)
+            pm = PHONE_RE.search(txt)
             if pm: 
                 phone = pm.group(1)
             if any(k in txt for k in ("Realty", "Broker", "Compass", "Keller", "Sotheby", "Douglas", "EXP")):
@@ -543,11 +647,11 @@ def extract_agents_dom(soup: BeautifulSoup) -> List[Dict]:
         uniq.append(a)
     return uniq[:5]
 
-def extract_price_history_dom(soup: BeautifulSoup) -> List[Dict]:
+def extract_price_history_dom(soup: BeautifulSoup, text: Optional[str] = None) -> List[Dict]:
     events = []
-    text = _text_all(soup)
-    line_re = re.compile(r'([A-Z][a-z]{2}\s+\d{1,2},\s+\d{4}).{0,40}\$\s*([0-9]{1,3}(?:,[0-9]{3})+)', re.S)
-    for m in line_re.finditer(text):
+    if text is None:
+        text = _text_all(soup)
+    for m in PRICE_EVENT_RE.finditer(text):
         dt = m.group(1)
         price = int(m.group(2).replace(",", ""))
         chunk = text[m.start(): m.end()+40]
@@ -588,16 +692,43 @@ def url_address_fallback(url: str) -> dict:
     return {k:v for k,v in out.items() if v}
 # ---------------- main per-page ----------------
 
-def parse_one_detail_html(html: str, url: str) -> Dict:
-    soup = BeautifulSoup(html or "", "html.parser")
-    sid = guess_source(url)
+# re-parsing identical HTML (retries, re-runs in the same process) reuses the
+# record instead of rebuilding the soup; keyed by blake2b(content) + url
+DETAIL_CACHE_SIZE = 256
+_detail_cache: "OrderedDict[Tuple[bytes, str], Dict]" = OrderedDict()
+
+def parse_one_detail_html(html: Union[str, bytes], url: str) -> Dict:
+    """Memoized front of _parse_one_detail_html. The cache keeps its own deep
+    copy and every call gets a fresh one, so callers may mutate the result."""
+    data = html if isinstance(html, (bytes, bytearray)) else (html or "").encode("utf-8", "surrogatepass")
+    key = (hashlib.blake2b(data, digest_size=16).digest(), url)
+    rec = _detail_cache.get(key)
+    if rec is not None:
+        _detail_cache.move_to_end(key)
+        out = copy.deepcopy(rec)
+        out["scraped_timestamp"] = now_utc_iso()
+        return out
+    rec = _parse_one_detail_html(html, url)
+    _detail_cache[key] = copy.deepcopy(rec)
+    if len(_detail_cache) > DETAIL_CACHE_SIZE:
+        _detail_cache.popitem(last=False)
+    return rec
+
+def _parse_one_detail_html(html: Union[str, bytes], url: str) -> Dict:
+    """html: page text, or the raw file bytes (decoded once for the DOM; the
+    block scan and JSON-LD slicing then work on the bytes directly)."""
+    raw = html if isinstance(html, (bytes, bytearray)) else None
+    if raw is not None:
+        html = _decode_html(raw)
+    soup = BeautifulSoup(html or "", "lxml")
+    sid, ext = source_and_id(url)
     rec: Dict = {
         "source_id": sid, "source_url": url,
-        "external_property_id": ext_id(url, sid),
+        "external_property_id": ext,
         "scraped_timestamp": now_utc_iso(),
         "status": "ok",
     }
-    if _blocked(html):
+    if _blocked(html, raw):
         rec["status"] = "blocked"
         return rec
 
@@ -608,7 +739,7 @@ def parse_one_detail_html(html: str, url: str) -> Dict:
         rec.update({k:v for k,v in redfin_from_nextdata(soup).items() if v not in (None,"",[],{})})
 
     # 2) JSON-LD (secondary)
-    jl = from_jsonld(soup)
+    jl = from_jsonld(soup, raw if raw is not None else html)
     for k,v in jl.items():
         if rec.get(k) in (None,"",[],{}):
             rec[k] = v
@@ -619,7 +750,10 @@ def parse_one_detail_html(html: str, url: str) -> Dict:
         if rec.get(k) in (None, "", [], {}):
             rec[k] = v
 
-    dom_enrich = extract_from_dom_common(soup, url)
+    # visible page text: one tree walk shared by the DOM / engagement / price-history regexes
+    page_text = _text_all(soup)
+
+    dom_enrich = extract_from_dom_common(soup, url, page_text)
     for k, v in dom_enrich.items():
         if rec.get(k) in (None, "", [], {}):
             rec[k] = v
@@ -638,7 +772,7 @@ def parse_one_detail_html(html: str, url: str) -> Dict:
                 rec[k] = v
 
     # Engagement (views/saves/shares)
-    eng = extract_engagement_dom(soup)
+    eng = extract_engagement_dom(soup, page_text)
     for k, v in eng.items():
         if rec.get(k) in (None, "", [], {}):
             rec[k] = v
@@ -651,7 +785,7 @@ def parse_one_detail_html(html: str, url: str) -> Dict:
 
     # Price history
     if rec.get("price_history") in (None, [], {}):
-        rec["price_history"] = extract_price_history_dom(soup)
+        rec["price_history"] = extract_price_history_dom(soup, page_text)
 
     # 4) URL-derived address (last resort)
     if not rec.get("street_address") or not rec.get("postal_code") or not rec.get("city") or not rec.get("state"):
@@ -691,7 +825,7 @@ def parse_all_details(batch_id: Optional[str] = None, limit: int = 50) -> None:
     wrote=0
     for f in files:
         try:
-            html=_read_text(f)
+            html=f.read_bytes()
             meta=_read_json(raw/f.name.replace("_raw.html","_meta.json"),{}) or {}
             url=meta.get("final_url") or meta.get("requested_url") or ""
             rec=parse_one_detail_html(html,url)
@@ -815,7 +949,7 @@ def to_adapted_rows(rec: Dict) -> Dict[str, List[Dict]]:
 
     # locations (نكتب صف حتى لو lat/lon None)
     loc_key = "|".join([street or "", s_trim(rec.get("unit_number")) or "", city or "", state or "", postal or "", str(lat or ""), str(lon or "")])
-    location_id = hashlib.sha1(loc_key.encode("utf-8")).hexdigest() if loc_key.strip("|") else stable_id(sid, "loc", property_id or surl or "")
+    location_id = id_digest(loc_key) if loc_key.strip("|") else stable_id(sid, "loc", property_id or surl or "")
     locations = [{
         "location_id": location_id,
         "street_address": street,
@@ -3,16 +3,13 @@
 
 from __future__ import annotations
 import argparse
-import re
 from pathlib import Path
 from typing import Dict, Optional
 from collections import defaultdict
 
 from src.fetch import fetch_detail_pages
 from src.parse_detail import parse_all_details, to_adapted_rows
-from src.settings import make_batch_dirs, to_float, to_int, s_trim, latest_batch_dir, read_json, write_json
-
-NUM_RE = re.compile(r"[^\d\.]+")
+from src.settings import make_batch_dirs, to_float, to_int, s_trim, latest_batch_dir, read_json, write_json_array
 
 # ---------------- helpers ----------------
 
@@ -23,7 +20,7 @@ def ensure_dirs(batch_id: Optional[str]) -> Dict[str, Path]:
     return {"base": latest, "raw": latest / "raw", "structured": latest / "structured", "qa": latest / "qa"}
 
 # ---------------- core steps ----------------
-def fetch_details(n: int, batch_id: Optional[str] = None):
+def fetch_details(n: int, batch_id: Optional[str] = None, use_async: bool = False):
     dirs = ensure_dirs(batch_id)
     raw_dir = dirs["raw"]
     urls = read_json(dirs["base"]/ "structured"/ "listing_urls.json", {}).get("urls", [])
@@ -33,7 +30,7 @@ def fetch_details(n: int, batch_id: Optional[str] = None):
     start_idx = max([int(p.name[:4]) for p in raw_dir.glob("1???_raw.html")] or [1000]) + 1
     subset = urls[:n]
     print(f"Batch {dirs['base'].name}: fetching {len(subset)} details …")
-    fetch_detail_pages(subset, batch_id=dirs["base"].name, start_idx=start_idx)
+    fetch_detail_pages(subset, batch_id=dirs["base"].name, start_idx=start_idx, use_async=use_async)
 
 def parse_details(limit: int, batch_id: Optional[str] = None, mode: str = "raw"):
     dirs = ensure_dirs(batch_id)
@@ -120,16 +117,16 @@ def parse_details(limit: int, batch_id: Optional[str] = None, mode: str = "raw")
     media = deduped_media
 
     # write outputs (ALL tables, no global caps)
-    write_json(struct/ "listings.json", listings)
-    write_json(struct/ "properties.json", properties)
-    write_json(struct/ "media.json", media)
-    write_json(struct/ "agents.json", agents)
-    write_json(struct/ "price_history.json", price_history)
-    write_json(struct/ "financials.json", financials)
-    write_json(struct/ "engagement.json", engagement)
-    write_json(struct/ "community_attributes.json", community_attributes)
-    write_json(struct/ "similar_properties.json", similar_properties)
-    write_json(struct/ "locations.json", locations)
+    write_json_array(struct/ "listings.json", listings)
+    write_json_array(struct/ "properties.json", properties)
+    write_json_array(struct/ "media.json", media)
+    write_json_array(struct/ "agents.json", agents)
+    write_json_array(struct/ "price_history.json", price_history)
+    write_json_array(struct/ "financials.json", financials)
+    write_json_array(struct/ "engagement.json", engagement)
+    write_json_array(struct/ "community_attributes.json", community_attributes)
+    write_json_array(struct/ "similar_properties.json", similar_properties)
+    write_json_array(struct/ "locations.json", locations)
 
     print("✅ wrote adapted JSON files in", struct)
 
@@ -139,6 +136,7 @@ def main():
     sub = ap.add_subparsers(dest="cmd", required=True)
     s1 = sub.add_parser("fetch-details")
     s1.add_argument("--n", type=int, default=10)
+    s1.add_argument("--async", dest="use_async", action="store_true")
     s2 = sub.add_parser("parse-details")
     s2.add_argument("--limit", type=int, default=50)
     s2.add_argument("--mode", choices=["raw","adapted"], default="raw")
@@ -147,7 +145,7 @@ def main():
     s3.add_argument("--limit", type=int, default=50)
     args = ap.parse_args()
     if args.cmd=="fetch-details": 
-        fetch_details(args.n)
+        fetch_details(args.n, use_async=args.use_async)
     elif args.cmd=="parse-details": 
         parse_details(args.limit, mode=args.mode)
     elif args.cmd=="run":
@@ -3,12 +3,31 @@
 
 from __future__ import annotations
 import datetime
+import functools
+import hashlib
+import math
 import os
-import re
 import json
 from pathlib import Path
-from typing import Dict, Any, Tuple
-NUM_RE = re.compile(r"[^\d\.]+")
+from typing import Dict, Any, Optional, Tuple
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+class _NumericKeep(dict):
+    """str.translate table that keeps decimal digits (any script, like regex \\d) and '.', deletes the rest."""
+    def __missing__(self, code: int):
+        keep = code if code == 46 or chr(code).isdecimal() else None
+        self[code] = keep
+        return keep
+
+# s.translate(NUMERIC_ONLY) == re.sub(r"[^\d\.]+", "", s), in one C-level pass
+NUMERIC_ONLY = _NumericKeep()
 
 # ---------- config loading ----------
 def get_project_root() -> Path:
@@ -25,11 +44,24 @@ CONFIG_PATH = PROJECT_ROOT / "config" / "listings_config.json"
 # SCHEMA_PATH = PROJECT_ROOT / "config" / "schema.json"  
 
 BATCHES_ROOT = PROJECT_ROOT / "data" / "batches"
+def newest_subdir(root: Path) -> Optional[Path]:
+    """Most recently modified directory under root (first one wins ties), or None.
+    scandir's d_type answers is_dir() without a stat, so each entry costs one stat call."""
+    best, best_mtime = None, None
+    with os.scandir(root) as it:
+        for e in it:
+            if not e.is_dir():
+                continue
+            mtime = e.stat().st_mtime
+            if best_mtime is None or mtime > best_mtime:
+                best, best_mtime = e.path, mtime
+    return Path(best) if best is not None else None
+
 def latest_batch_dir() -> Path:
-    ds = [p for p in BATCHES_ROOT.iterdir() if p.is_dir()]
-    if not ds: 
+    latest = newest_subdir(BATCHES_ROOT)
+    if latest is None: 
         raise RuntimeError("No batches found. Run: python -m src.batch")
-    return max(ds, key=lambda p: p.stat().st_mtime)
+    return latest
 
 def load_config() -> Dict[str, Any]:
     if not CONFIG_PATH.exists():
@@ -42,6 +74,23 @@ CFG = load_config()
 REQUEST_TIMEOUT_SEC: int = int(CFG["run"].get("request_timeout_sec", 30))
 SLEEP_RANGE_SEC: Tuple[float, float] = tuple(CFG["run"].get("sleep_range_sec", [1.2, 2.8]))
 USER_AGENT: str = CFG["run"].get("user_agent", "Mozilla/5.0")
+# digest behind every stable ID. sha1 (default) keeps IDs identical to earlier batches;
+# xxh3 / blake2b are faster but produce different IDs, so only switch on a fresh dataset.
+ID_HASH: str = CFG.get("id_hash", "sha1")
+
+# ---------- stable IDs ----------
+# retried / repeated URLs and shared addresses hash the same key again within a batch
+@functools.lru_cache(maxsize=4096)
+def id_digest(key: str) -> str:
+    """Hex digest of an ID key with the configured ID_HASH."""
+    b = key.encode("utf-8")
+    if ID_HASH == "xxh3":
+        if xxhash is None:
+            raise RuntimeError("id_hash=xxh3 requires the xxhash package")
+        return xxhash.xxh3_128_hexdigest(b)
+    if ID_HASH == "blake2b":
+        return hashlib.blake2b(b, digest_size=20).hexdigest()
+    return hashlib.sha1(b).hexdigest()
 
 # ---------- convenience getters ----------
 def get_target_areas() -> list[Dict[str, Any]]:
@@ -81,10 +130,20 @@ def default_headers() -> Dict[str, str]:
 
 # ---------- helpers ----------
 
+# Native numbers skip the str()/translate round trip. Results match the string path
+# (which drops the sign, and yields None for bools and nan/inf); floats printed in
+# exponent form (1e+16, 1e-05) now convert by value instead of being digit-mangled.
 def to_int(x): 
     if x is None: 
         return None
-    s = re.sub(NUM_RE, "", str(x))
+    t = type(x)
+    if t is int:
+        return abs(x)
+    if t is float:
+        return int(abs(x)) if math.isfinite(x) else None
+    if t is bool:
+        return None
+    s = str(x).translate(NUMERIC_ONLY)
     if not s:
         return None
     try:
@@ -95,7 +154,14 @@ def to_int(x):
 def to_float(x):
     if x is None: 
         return None
-    s = re.sub(NUM_RE, "", str(x))
+    t = type(x)
+    if t is float:
+        return abs(x) if math.isfinite(x) else None
+    if t is int:
+        return float(abs(x))
+    if t is bool:
+        return None
+    s = str(x).translate(NUMERIC_ONLY)
     if not s: 
         return None
     try: 
@@ -111,14 +177,71 @@ def s_trim(x):
 
 # ---------- JSON Files Helpers ----------
 
+# First non-space char of any JSON document (N / I: stdlib's NaN / Infinity).
+_JSON_START = frozenset('{["-0123456789tfnNI')
+
+def json_loads(s):
+    """json.loads via orjson when installed; stdlib json still handles what orjson rejects (NaN, ...)."""
+    # JS state text (`var x = {...}`, `window.__X__ = ...`) can never parse:
+    # fail on the first char instead of letting both parsers raise.
+    head = s[:64].lstrip()[:1]
+    if head:
+        if isinstance(head, (bytes, bytearray)):
+            head = chr(head[0])
+        if head not in _JSON_START:
+            raise json.JSONDecodeError("Expecting value", s if isinstance(s, str) else "", 0)
+    if orjson is not None:
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(s)
+
 def read_json(p: Path, default=None):
     if not p.exists(): 
         return default
     try: 
-        return json.loads(p.read_text(encoding="utf-8"))
+        return json_loads(p.read_bytes())
     except Exception: 
         return default
         
+def json_dumps_bytes(obj) -> bytes:
+    """indent=2 UTF-8 JSON; orjson when installed, stdlib json for anything orjson can't encode."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
 def write_json(p: Path, obj):
     p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+    p.write_bytes(json_dumps_bytes(obj))
+
+def write_json_array(p: Path, rows):
+    """Same bytes as write_json(p, rows) for a list, but serialized row by row
+    (peak memory is one row, not the whole table). Rows are re-indented one
+    level; JSON strings never hold a raw newline, so the replace is safe."""
+    p.parent.mkdir(parents=True, exist_ok=True)
+    with p.open("wb") as f:
+        first = True
+        for r in rows:
+            f.write(b"[\n  " if first else b",\n  ")
+            f.write(json_dumps_bytes(r).replace(b"\n", b"\n  "))
+            first = False
+        f.write(b"[]" if first else b"\n]")
+
+def json_line_bytes(obj) -> bytes:
+    """One compact JSON document + newline (JSON Lines record)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+def write_jsonl(p: Path, rows):
+    """Row-by-row JSON Lines: no whole-table buffer, and readers can stream it back."""
+    p.parent.mkdir(parents=True, exist_ok=True)
+    with p.open("wb") as f:
+        f.writelines(json_line_bytes(r) for r in rows)
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import json
 import re
 import sys
@@ -46,9 +47,13 @@ def resolve_config_path(explicit: Optional[str]) -> Path:
 
 # ===================== helpers =====================
 
+_WS_RE = re.compile(r"\s+")
+_NON_SLUG_RE = re.compile(r"[^A-Za-z0-9\-]")
+
+@functools.lru_cache(maxsize=256)
 def _norm_city_dash(city: str) -> str:
-    v = re.sub(r"\s+", "-", (city or "").strip())
-    v = re.sub(r"[^A-Za-z0-9\-]", "", v)
+    v = _WS_RE.sub("-", (city or "").strip())
+    v = _NON_SLUG_RE.sub("", v)
     return v
 
 def _zillow_url(city: str, state_code: str) -> str:
@@ -63,25 +68,52 @@ def _rf_headers() -> Dict[str, str]:
 
 # ===================== Redfin lookup =====================
 
+_RF_SESSION: Optional[requests.Session] = None
+
+def _redfin_session() -> requests.Session:
+    """
+    One keep-alive session shared by every lookup (TLS + cookies reused across cities).
+    The homepage bootstrap runs until it first succeeds; failures raise and are retried
+    on the next lookup.
+    """
+    global _RF_SESSION
+    if _RF_SESSION is None:
+        s = requests.Session()
+        s.headers.update(_rf_headers())
+        home = s.get("https://www.redfin.com/", timeout=20)
+        home.raise_for_status()
+        _RF_SESSION = s
+    return _RF_SESSION
+
+# (city, state_code) → Redfin city URL; only found URLs are kept, so a blocked / failed
+# lookup is tried again the next time that city comes up
+_RF_CITY_URLS: Dict[Tuple[str, str], str] = {}
+
 def _redfin_autocomplete(city: str, state_code: str) -> Optional[str]:
     """
     Resolve a Redfin city URL by:
-      1) Bootstrapping a session (homepage) to get cookies,
+      1) Bootstrapping the shared session (homepage, once) to get cookies,
       2) Calling 'stingray/do/location-autocomplete' with same session,
       3) Picking first CITY row and returning its URL or building from id.
-    Returns None if blocked or not found.
+    Returns None if blocked or not found. Successful lookups are memoized per
+    (city, state_code) for the run, so repeated areas don't redo the round trips.
     """
+    key = (city, state_code)
+    url = _RF_CITY_URLS.get(key)
+    if url is None:
+        url = _redfin_lookup(city, state_code)
+        if url is not None:
+            _RF_CITY_URLS[key] = url
+    return url
+
+def _redfin_lookup(city: str, state_code: str) -> Optional[str]:
     q = f"{city}, {state_code}"
     ac_url = "https://www.redfin.com/stingray/do/location-autocomplete"
     params = {"location": q, "start": 0, "count": 10, "v": 2}
 
-    s = requests.Session()
-    s.headers.update(_rf_headers())
-
-    # 1) bootstrap cookies
+    # 1) bootstrap cookies (first lookup only)
     try:
-        home = s.get("https://www.redfin.com/", timeout=20)
-        home.raise_for_status()
+        s = _redfin_session()
     except requests.RequestException as e:
         print(f"[warn] Redfin bootstrap failed for {q}: {e}")
         return None